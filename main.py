@@ -2,19 +2,41 @@
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+import math
 from mechanism import Mechanism, Joint, Link, mechanism_is_valid
-from visualization import Visualizer
-from movement_speed import StrandbeestSpeed
-from markup_language import MechanismLatex
-import time
+import os
+import logging
 from database import DatabaseConnector
 from datetime import date
+# visualization, movement_speed und markup_language werden erst in den Abschnitten importiert,
+# die sie benötigen (kürzerer Kaltstart, Python cacht den Import danach)
+
+logger = logging.getLogger(__name__)
+if os.environ.get("MECH_DEBUG") and not logger.handlers:
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.StreamHandler())
 
 # ================================================================================
 # Datenbank-Verbindung
 # ================================================================================
-db_connector = DatabaseConnector()
+@st.cache_resource(show_spinner=False)
+def get_db_connector() -> DatabaseConnector:
+    """
+    Datenbank-Verbindung als geteilte Ressource: wird einmal pro Server-Prozess erzeugt
+    und bei jedem Rerun wiederverwendet (TinyDB-Instanz bleibt offen, bis close() aufgerufen wird).
+    """
+    return DatabaseConnector()
+
+db_connector = get_db_connector()
+
+# ================================================================================
+# Hilfsfunktionen
+# ================================================================================
+def _edge(a: int, b: int) -> tuple:
+    """
+    Verbindung als sortiertes Index-Tupel (kleinerer Index zuerst), ohne sorted() für zwei Werte.
+    """
+    return (a, b) if a < b else (b, a)
 
 # ================================================================================
 # Funktionen zur Validierung der Gelenktyp-Konfiguration und Berechnung der Anzahl benötigter Links
@@ -89,10 +111,317 @@ def reset_to_standard():
         {"x": 0.0, "y": 0.0, "type": "Frei beweglich", "center": None, "radius": None}      # Frei bewegliches Gelenk (p1)
     ]
 
-    st.session_state["links"] = []
+    st.session_state["links"] = {}
 
     st.session_state["protected_links"] = set()
 
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _build_preview(joints_key: tuple, links_key: tuple):
+    """
+    Erstellt die Plotly-Figur für die Live-Vorschau aus den hashbaren Schlüsseln.
+    Reruns durch andere Widgets (z.B. Eingabe des Namens) treffen den Cache.
+    cache_resource statt cache_data: die Figur wird bei einem Treffer nicht erneut entpickelt
+    (ca. 17 ms pro Rerun), dafür wird sie geteilt und darf nicht verändert werden.
+    """
+    joints = [{"x": x, "y": y, "type": joint_type, "center": center, "radius": radius}
+              for x, y, joint_type, center, radius in joints_key]
+    from visualization import Visualizer
+
+    return Visualizer.plot_configuration_plotly(joints, links_key)
+
+def make_preview(joints: list, links: list):
+    """
+    Erstellt die Plotly-Figur für die Live-Vorschau der Gelenkkonfiguration.
+    Plotly rendert im Browser, dadurch entfällt das Rastern eines PNG bei jedem Rerun.
+    """
+    joints_key = tuple((j["x"], j["y"], j["type"], tuple(j["center"]) if j["center"] else None, j["radius"])
+                       for j in joints)
+    links_key = tuple(tuple(link) for link in links)
+    return _build_preview(joints_key, links_key)
+
+# ================================================================================
+# Gecachte Datenbankabfragen
+# ================================================================================
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_find_all_mechanisms() -> list:
+    """
+    Liste der gespeicherten Mechanismen ({id, name, version}-Dictionaries), gecacht über Reruns hinweg.
+    Nach jedem Speichern/Löschen (bzw. Import der Datenbank) muss der Cache mit
+    clear_mechanism_caches() zurückgesetzt werden.
+    """
+    return Mechanism.find_all_mechanisms()
+
+@st.cache_resource(show_spinner=False)
+def cached_load_mechanism(mechanism_id: str):
+    """
+    Mechanismus-Objekt (oder None) zur ID, gecacht als Objekt im Speicher.
+    Das zurückgegebene Objekt wird geteilt und darf daher nicht verändert werden
+    (Werte für Session States immer kopieren). Nach jedem Speichern/Löschen (bzw. Import der
+    Datenbank) muss der Cache mit clear_mechanism_caches() zurückgesetzt werden.
+    """
+    return Mechanism.load_mechanism(mechanism_id)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def compute_trajectories(mechanism_id: str, version: int, steps: int):
+    """
+    Kinematik eines gespeicherten Mechanismus, gecacht über (ID, Version, Schritte).
+    Lädt vorhandene Kinematik aus der Datenbank oder berechnet sie (und speichert sie bei fehlerfreier Berechnung).
+    Gibt (theta_range, trajectories, fail_count, aus_db) zurück oder None, wenn der Mechanismus nicht existiert.
+    Wie die anderen Caches nach Speichern/Löschen (bzw. Import der Datenbank) mit clear_mechanism_caches() zurücksetzen.
+    """
+    # Mechanismus aus der Datenbank (die Kinematik-Berechnung arbeitet auf Arrays und verändert die Gelenke nicht)
+    mech_object = Mechanism.load_mechanism(mechanism_id)
+    if not mech_object:
+        return None
+
+    # Prüfung, ob Kinematik (mit dieser Geometrie und Schrittweite) schon berechnet wurde (mechanism_kinematics)
+    theta_range, trajectories = Mechanism.load_kinematics_by_geometry(mech_object.geometry_hash(), steps)
+    if trajectories is not None:
+        # Treffer eines anderen Mechanismus bzw. einer anderen Version mit gleicher Geometrie: Kinematik zusätzlich
+        # unter dieser ID/Version speichern, damit load_kinematics() (z.B. Geschwindigkeitsberechnung) sie findet
+        if Mechanism.load_kinematics(mechanism_id, version, steps)[1] is None:
+            mech_object.save_kinematics(theta_range, trajectories, steps)
+        return theta_range, trajectories, None, True
+
+    # Keine Kinematikdaten vorhanden -> Berechnung durchführen
+    theta_range = mech_object.compute_theta_range(steps=steps)
+    trajectories, fail_count = mech_object.kinematics(theta_range)
+    # Kinematik nur bei fehlerfreier Berechnung in DB speichern
+    if not fail_count:
+        mech_object.save_kinematics(theta_range, trajectories, steps)
+    return np.asarray(theta_range), np.asarray(trajectories), fail_count, False
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def run_simulation(mechanism_id: str, version: int, steps: int, _mech_object):
+    """
+    Komplette Simulation eines gespeicherten Mechanismus, gecacht über (ID, Version, Schritte):
+    Kinematik (compute_trajectories), GIF und CSV. GIF und CSV werden als Bytes im Speicher gehalten,
+    damit Anzeige und Download-Buttons bei Reruns keine Dateien neu erzeugen oder öffnen müssen.
+    _mech_object (nur lesend, für Gelenke und Links) wird wegen des Unterstrichs nicht gehasht.
+    Gibt (theta_range, trajectories, fail_count, aus_db, gif_bytes, csv_bytes) zurück oder None.
+    """
+    from visualization import Visualizer
+
+    result = compute_trajectories(mechanism_id, version, steps)
+    if not result:
+        return None
+    theta_range, trajectories, fail_count, from_db = result
+
+    # GIF erstellen und als Bytes einlesen (temporäre Datei danach löschen)
+    gif_path = Visualizer.create_gif(
+        thetas=theta_range,
+        trajectories=trajectories,
+        joints=_mech_object.joints,
+        links=_mech_object.links
+    )
+    with open(gif_path, "rb") as gif_data:
+        gif_bytes = gif_data.read()
+    os.remove(gif_path)
+
+    # CSV direkt im Speicher erzeugen
+    csv_bytes = _mech_object.kinematics_to_csv(theta_range=theta_range, trajectories=trajectories)
+
+    return theta_range, trajectories, fail_count, from_db, gif_bytes, csv_bytes
+
+def clear_mechanism_caches():
+    """
+    Setzt alle gecachten Datenbank-Ergebnisse zurück (nach Speichern, Löschen oder Import der Datenbank),
+    inklusive des in der Simulation gemerkten Mechanismus-Objekts.
+    """
+    cached_find_all_mechanisms.clear()
+    cached_load_mechanism.clear()
+    compute_trajectories.clear()
+    run_simulation.clear()
+    Mechanism.clear_kinematics_cache()
+    st.session_state.pop("sim_config", None)
+    st.session_state.pop("sim_mechanism", None)
+
+# ================================================================================
+# Fragmente für die Gelenk- und Verbindungs-Konfiguration
+# (Widget-Interaktionen führen nur das jeweilige Fragment erneut aus, nicht das ganze Skript)
+# ================================================================================
+def joint_labels() -> tuple:
+    """
+    Anzeigenamen aller Gelenke ("Gelenk 1", "Gelenk 2", ...) als Tupel, einmal pro Fragment-Lauf erstellt.
+    """
+    return tuple(f"Gelenk {i + 1}" for i in range(len(st.session_state["joints"])))
+
+def commit_joint_form():
+    """
+    Callback des Formulars: übernimmt Koordinaten und Typen aus den Widget-Keys x_i / y_i / type_i vor dem Rerun
+    in st.session_state['joints'] (nur beim Absenden, nicht bei jeder Eingabe). Dadurch ist auch die Liste
+    der fixierten Gelenke schon zu Beginn des Reruns aktuell.
+    """
+    for i, joint in enumerate(st.session_state["joints"]):
+        joint["x"] = st.session_state[f"x_{i}"]
+        joint["y"] = st.session_state[f"y_{i}"]
+        joint["type"] = st.session_state[f"type_{i}"]
+
+@st.fragment
+def joints_editor():
+    """
+    Eingabefelder (Koordinaten, Typ, ggf. Drehpunkt) für jedes Gelenk.
+    """
+    # Fixierte Gelenke (mögliche Drehpunkte) einmal vor der Schleife bestimmen
+    # (Typ-Änderungen sind durch commit_joint_form bereits vor dem Rerun übernommen)
+    fixed_joint_indices = [k for k, j in enumerate(st.session_state["joints"]) if j["type"] == "Fixiert"]
+    labels = joint_labels()
+    fix_joint_labels = [labels[k] for k in fixed_joint_indices]
+    # Zuordnungen Gelenk-Index <-> Position in der Drehpunkt-Auswahl (statt list.index je Kreisbahngelenk)
+    fixed_position = {k: pos for pos, k in enumerate(fixed_joint_indices)}
+    fixed_label_to_idx = dict(zip(fix_joint_labels, fixed_joint_indices))
+
+    if st.session_state["unit"]:
+        unit = f" [{st.session_state["unit"]}]"
+    else:
+        unit = ""
+
+    # Koordinaten und Typen aller Gelenke in einem Formular: Eingaben lösen erst mit "Übernehmen" einen Rerun aus
+    options = ["Fixiert", "Frei beweglich", "Kreisbahnbewegung"]
+    with st.form("joint_form", clear_on_submit=False, border=False):
+        # Werte werden nicht zugewiesen, sondern über die Widget-Keys x_i / y_i / type_i gelesen (commit_joint_form)
+        for i, joint in enumerate(st.session_state["joints"]):
+            st.markdown(f"##### Gelenk {i + 1}")
+            col_x, col_y = st.columns(2)
+            with col_x:
+                st.number_input(f"**x-Koordinate *Gelenk {i + 1}*{unit}**", value=joint["x"], step=0.1, key=f"x_{i}") 
+            with col_y:
+                st.number_input(f"**y-Koordinate *Gelenk {i + 1}*{unit}**", value=joint["y"], step=0.1, key=f"y_{i}")
+
+            # Ermittlung des Index, der dem aktuellen joint["type"] entspricht
+            try:
+                idx = options.index(joint["type"])
+            except ValueError:
+                idx = 0
+
+            st.selectbox(
+                f"**Typ *Gelenk {i + 1}***",
+                options = options,
+                key = f"type_{i}",
+                index = idx,
+                disabled = st.session_state["locked"]
+            )
+
+        st.form_submit_button("**Übernehmen**", icon=":material/check:", on_click=commit_joint_form,
+                              help="Übernimmt die eingegebenen Koordinaten und Typen aller Gelenke.")
+
+    # Koordinaten einmal als (N, 2)-Array für Drehpunkt und Radius der Kreisbahngelenke.
+    # Wird bei jedem Lauf des Editors aus den Gelenken aufgebaut und ist damit auch nach Laden,
+    # Zurücksetzen oder Hinzufügen/Entfernen von Gelenken aktuell.
+    xy = np.array([(joint["x"], joint["y"]) for joint in st.session_state["joints"]], dtype=np.float64).reshape(-1, 2)
+
+    # Drehpunkt-Auswahl außerhalb des Formulars (legt sofort die geschützte Verbindung an)
+    for i, joint in enumerate(st.session_state["joints"]):
+        if joint["type"] == "Kreisbahnbewegung":
+            st.write("**Wähle ein fixiertes Gelenk als Drehpunk:**")
+
+            # Prüfung, ob Gelenk schon center_joint_index hat
+            default_index_selectbox = fixed_position.get(joint.get("center_joint_index"))
+            
+            selected_label = st.selectbox(
+                f"**Drehpunkt *Gelenk {i + 1}***",
+                options = fix_joint_labels,
+                index = default_index_selectbox,
+                placeholder = "Bitte auswählen",
+                key=f"center_joint_{i}"
+            )
+
+            # Überprüfung, ob Auswahl durch User getroffen wurde
+            if selected_label:
+                center_joint_index = fixed_label_to_idx[selected_label]
+
+                # Alte Verbindung entfernen (falls vorhanden)
+                old_center = joint.get("center_joint_index", None)
+                if old_center is not None and old_center != center_joint_index:
+                    old_link = _edge(old_center, i)
+                    # Verbindung Drehpunkt und Kreisbahngelenk ist immer protected
+                    if old_link in st.session_state["links"]:
+                        del st.session_state["links"][old_link]
+                    if old_link in st.session_state["protected_links"]:
+                        st.session_state["protected_links"].remove(old_link)
+
+                # neuen center_joint_index in "joint" speichern
+                joint["center_joint_index"] = center_joint_index
+
+                # Koordinaten des Drehpunkts speichern
+                joint["center"] = xy[center_joint_index].tolist()
+
+                # Radius berechnen (skalar mit math.sqrt auf Python-floats, liefert dieselben Werte wie die ursprüngliche Formel)
+                dx, dy = (xy[i] - xy[center_joint_index]).tolist()
+                radius = math.sqrt(dx*dx + dy*dy)
+                joint["radius"] = radius
+                st.write(f"Radius: {radius:.2f} {st.session_state['unit']}")
+
+                # Verbindung zw. Drehpunkt und Kreisbahngelenk hinzufügen (sortiert und protected)
+                new_link = _edge(center_joint_index, i)
+                if new_link not in st.session_state["links"]:
+                    st.session_state["links"][new_link] = None
+                    st.session_state["protected_links"].add(new_link)
+                    st.toast(f"Geschützte Verbindung zwischen Drehpunkt {center_joint_index + 1} und Gelenk {i + 1} auf Kreisbahn hinzugefügt (kann nicht manuell entfernt werden).", icon="✅")
+                    st.rerun()
+
+            st.divider()
+
+@st.fragment
+def links_editor():
+    """
+    Anzeige, Hinzufügen und Entfernen von Verbindungen zwischen Gelenken.
+    """
+    # aktuelle Verbindungen anzeigen
+    if st.session_state["links"]:
+        with st.expander("**Aktuelle Verbindungen anzeigen**", expanded=False, icon = ":material/visibility:"):
+            for link in st.session_state["links"]:
+                st.write(f"Gelenk {link[0] + 1} - Gelenk {link[1] + 1}")
+
+            # Ausgabe, wie viele Links für gültige Konfiguration benötigt werden
+            required = required_links() - len(st.session_state["links"])
+            st.info(f"**Anzahl noch benötigter Verbindungen: *{required}***")
+
+
+    labels = joint_labels()
+    label_to_idx = {label: i for i, label in enumerate(labels)}
+    joint1 = st.selectbox("**Verbindung von**", options = labels, key="link_joint1", index = None, placeholder = "Gelenk auswählen")
+    joint2 = st.selectbox("**zu**", options = labels, key="link_joint2", index = None, placeholder = "Gelenk auswählen")
+
+    if st.button("**Verbindung hinzufügen**", icon = ":material/add:"):
+        j1 = label_to_idx.get(joint1)
+        j2 = label_to_idx.get(joint2)
+        new_link = _edge(j1, j2) if j1 is not None and j2 is not None else None
+        existing_link = new_link in st.session_state["links"]
+
+        if new_link is not None and not existing_link and j1 != j2:
+            st.session_state["links"][new_link] = None
+            st.toast(f"Verbindung zwischen Gelenk {joint1} und Gelenk {joint2} hinzugefügt.", icon="✅")
+            st.rerun()
+        else:
+            st.toast("Ungültige Verbindung oder Verbindung bereits vorhanden.", icon="❌")
+
+    if st.button("**Letzte *ungeschützte* Verbindung entfernen**", icon = ":material/remove:"):
+        # Suche von hinten nach vorn (um letzte ungeschützte Verbindung zu finden)
+        found_unprotected = False
+        for link in reversed(st.session_state["links"]): # Dict behält die Einfügereihenfolge
+            if link not in st.session_state["protected_links"]:
+                del st.session_state["links"][link]
+                st.toast(f"Verbindung {link} erfolgreich entfernt.", icon="✅")
+                found_unprotected = True
+                break
+        if found_unprotected:
+            st.rerun()
+        else:
+            st.toast("Keine ungeschützte Verbindung gefunden.", icon="❌")
+
+@st.fragment
+def preview_panel():
+    """
+    Live-Vorschau als eigenes Fragment: "Vorschau aktualisieren" zeichnet nur die Vorschau neu,
+    das restliche Skript (Konfiguration, Simulation, Datenbank) läuft dabei nicht erneut.
+    """
+    # Änderungen in den Fragmenten (Gelenke/Verbindungen) lösen keinen Rerun der Vorschau aus
+    st.button("**Vorschau aktualisieren**", icon=":material/refresh:", key="refresh_preview",
+              help="Aktualisiert die Vorschau mit der aktuellen Gelenk- und Verbindungs-Konfiguration.")
+    fig = make_preview(st.session_state["joints"], st.session_state["links"])
+    st.plotly_chart(fig, use_container_width=False)
+
 # ================================================================================
 # Callback-Funktion für Selectbox (Mechanismus laden)
 def set_flag():
@@ -113,44 +442,35 @@ st.header(":material/modeling: Simulation ebener Mechanismen",
 # ================================================================================
 # Session State Initialisierung
 # ================================================================================
-# Gelenke und Verbindungen
-if "joints" not in st.session_state:
+# Standardwerte aller Session States (main.py wird bei jedem Rerun neu ausgeführt,
+# die veränderbaren Standardwerte werden also nicht zwischen Sitzungen geteilt)
+_DEFAULTS = {
+    # Gelenke und Verbindungen
     # Initialisierung der Gelenke (Minimum 4 Gelenke mit 2 fixierten Gelenken, 1 Kreisbahnbewegung und 1 frei-beweglichem Gelenk)
-    st.session_state["joints"] = [
+    "joints": [
         {"x": 0.0, "y": 0.0, "type": "Fixiert", "center": None, "radius": None},            # Kreismittelpunkt (c)
         {"x": 0.0, "y": 0.0, "type": "Fixiert", "center": None, "radius": None},            # Fixiertes Gelenk (p0)
         {"x": 0.0, "y": 0.0, "type": "Kreisbahnbewegung", "center": None, "radius": None},  # Kreisbahnbewegung (p2)
         {"x": 0.0, "y": 0.0, "type": "Frei beweglich", "center": None, "radius": None}      # Frei bewegliches Gelenk (p1)
-    ]
-
-if "links" not in st.session_state:
-    st.session_state["links"] = []
-if "protected_links" not in st.session_state:
-    st.session_state["protected_links"] = set()
-
-# Einheit für Längenangaben
-if "unit" not in st.session_state:
-    st.session_state["unit"] = ""
-
-# Session States für aktuell geladenen Mechanismus
-if "current_mech_id" not in st.session_state:
-    st.session_state["current_mech_id"] = None
-if "current_mech_name" not in st.session_state:
-    st.session_state["current_mech_name"] = ""
-if "current_mech_version" not in st.session_state:
-    st.session_state["current_mech_version"] = 0
-
-# Session States für Sperr-Logik
-if "locked" not in st.session_state:
-    st.session_state["locked"] = False
-if "prev_locked" not in st.session_state:
-    st.session_state["prev_locked"] = False
-if "show_message_manually" not in st.session_state:
-    st.session_state["show_message_manually"] = False
-if "show_message_reset" not in st.session_state:
-    st.session_state["show_message_reset"] = False
-if "rerun" not in st.session_state:
-    st.session_state["rerun"] = False
+    ],
+    # Dict (Verbindung -> None) statt Liste: O(1)-Prüfung auf vorhandene Verbindungen, Reihenfolge bleibt erhalten
+    "links": {},
+    "protected_links": set(),
+    # Einheit für Längenangaben
+    "unit": "",
+    # aktuell geladener Mechanismus
+    "current_mech_id": None,
+    "current_mech_name": "",
+    "current_mech_version": 0,
+    # Sperr-Logik
+    "locked": False,
+    "prev_locked": False,
+    "show_message_manually": False,
+    "show_message_reset": False,
+    "rerun": False,
+}
+for key, value in _DEFAULTS.items():
+    st.session_state.setdefault(key, value)
 
 # ================================================================================
 # Spalten-Layout (für Konfiguration und Visualisierung)
@@ -203,30 +523,23 @@ with col1:
                         st.session_state["show_message_manually"] = True
                 
                 if st.session_state["show_message_manually"]:
-                    st.info("Bitte Gelenke manuell anpassen. Dann erneut Button (:material/edit:) betätigen.")
+                    st.toast("Bitte Gelenke manuell anpassen. Dann erneut Button (:material/edit:) betätigen.", icon="ℹ️")
                     st.session_state["rerun"] = True
                     st.session_state["show_message_manually"] = False
 
                 if st.session_state["show_message_reset"]:
-                    # erneute Vailidierung
-                    valid_2, msg_2 = validate_joint_types()
-                    if valid_2:
-                        st.success("Gelenk-Konfiguration zurückgesetzt. Gelenktyp-Auswahl gesperrt.")
-                        st.session_state["rerun"] = True
-                        st.session_state["show_message_reset"] = False
-                        st.session_state["locked"] = True
-                    else:
-                        st.error("Fehler beim Zurücksetzen der Gelenk-Konfiguration.")
-                        st.session_state["rerun"] = True
-                        st.session_state["show_message_reset"] = False
-                        st.session_state["locked"] = False
+                    # Standardlayout (2 fix, 1 Kreisbahn, 1 frei) ist per Konstruktion gültig, keine erneute Validierung nötig
+                    st.toast("Gelenk-Konfiguration zurückgesetzt. Gelenktyp-Auswahl gesperrt.", icon="✅")
+                    st.session_state["rerun"] = True
+                    st.session_state["show_message_reset"] = False
+                    st.session_state["locked"] = True
                 
             else:
-                st.success("Gelenk-Konfiguration ist gültig, Typ-Auswahl gesperrt.")
+                st.toast("Gelenk-Konfiguration ist gültig, Typ-Auswahl gesperrt.", icon="✅")
                 st.session_state["rerun"] = True
         else:
             # Sperrung deaktiviert -> Gelenktyp-Auswahl freigeben
-            st.info("Gelenktyp-Auswahl freigegeben.")
+            st.toast("Gelenktyp-Auswahl freigegeben.", icon="ℹ️")
             st.session_state["rerun"] = True
         
     
@@ -235,7 +548,6 @@ with col1:
     
     if st.session_state["rerun"]:
         st.session_state["rerun"] = False
-        time.sleep(1)
         st.rerun()
 
     # --------------------------------------------------
@@ -256,152 +568,14 @@ with col1:
     # --------------------------------------------------
     # Eingabefelder für jedes Gelenk
     # --------------------------------------------------
-    for i, joint in enumerate(st.session_state["joints"]):
-        options = ["Fixiert", "Frei beweglich", "Kreisbahnbewegung"]
-        # Ermittlung des Index, der dem aktuellen joint["type"] entspricht
-        try:
-            idx = options.index(joint["type"])
-        except ValueError:
-            idx = 0
-
-        if st.session_state["unit"]:
-            unit = f" [{st.session_state["unit"]}]"
-        else:
-            unit = ""
-            
-        st.markdown(f"##### Gelenk {i + 1}")
-        col_x, col_y = st.columns(2)
-        with col_x:
-            joint["x"] = st.number_input(f"**x-Koordinate *Gelenk {i + 1}*{unit}**", value=joint["x"], step=0.1, key=f"x_{i}") 
-        with col_y:
-            joint["y"] = st.number_input(f"**y-Koordinate *Gelenk {i + 1}*{unit}**", value=joint["y"], step=0.1, key=f"y_{i}")
-
-        joint["type"] = st.selectbox(
-            f"**Typ *Gelenk {i + 1}***",
-            options = options,
-            key = f"type_{i}",
-            index = idx,
-            disabled = st.session_state["locked"]
-        )
-
-        if joint["type"] == "Kreisbahnbewegung":
-            st.write("**Wähle ein fixiertes Gelenk als Drehpunk:**")
-
-            fixed_joint_indices = []
-            fix_joint_labels = []
-
-            for idx, j in enumerate(st.session_state["joints"]):
-                if j["type"] == "Fixiert":
-                    fixed_joint_indices.append(idx)
-                    fix_joint_labels.append(f"Gelenk {idx + 1}")
-            
-            # Prüfung, ob Gelenk schon center_joint_index hat
-            default_index_selectbox = None
-            if "center_joint_index" in joint:
-                cidx = joint["center_joint_index"]
-                if cidx in fixed_joint_indices:
-                    label_str = f"Gelenk {cidx + 1}"
-                    if label_str in fix_joint_labels:
-                        default_index_selectbox = fix_joint_labels.index(label_str)
-            
-            selected_label = st.selectbox(
-                f"**Drehpunkt *Gelenk {i + 1}***",
-                options = fix_joint_labels,
-                index = default_index_selectbox,
-                placeholder = "Bitte auswählen",
-                key=f"center_joint_{i}"
-            )
-
-            # Überprüfung, ob Auswahl durch User getroffen wurde
-            if selected_label:
-                label_index = fix_joint_labels.index(selected_label)
-                center_joint_index = fixed_joint_indices[label_index]
-
-                # Alte Verbindung entfernen (falls vorhanden)
-                old_center = joint.get("center_joint_index", None)
-                if old_center is not None and old_center != center_joint_index:
-                    old_link = tuple(sorted((old_center, i)))
-                    # Verbindung Drehpunkt und Kreisbahngelenk ist immer protected
-                    if old_link in st.session_state["links"]:
-                        st.session_state["links"].remove(old_link)
-                    if old_link in st.session_state["protected_links"]:
-                        st.session_state["protected_links"].remove(old_link)
-
-                # neuen center_joint_index in "joint" speichern
-                joint["center_joint_index"] = center_joint_index
-
-                # Koordinaten des Drehpunkts speichern
-                center_x = st.session_state["joints"][center_joint_index]["x"]
-                center_y = st.session_state["joints"][center_joint_index]["y"]
-                joint["center"] = [center_x, center_y]
-
-                # Radius berechnen
-                radius = np.sqrt((joint["x"] - center_x)**2 + (joint["y"] - center_y)**2)
-                joint["radius"] = radius
-                st.write(f"Radius: {radius:.2f} {st.session_state['unit']}")
-
-                # Verbindung zw. Drehpunkt und Kreisbahngelenk hinzufügen (sortiert und protected)
-                new_link = tuple(sorted((center_joint_index, i)))
-                if new_link not in st.session_state["links"]:
-                    st.session_state["links"].append(new_link)
-                    st.session_state["protected_links"].add(new_link)
-                    st.success(f"Geschützte Verbindung zwischen Drehpunkt {center_joint_index + 1} und Gelenk {i + 1} auf Kreisbahn hinzugefügt (kann nicht manuell entfernt werden).")
-                    time.sleep(1)
-                    st.rerun()
-
-        st.divider()
+    joints_editor()
 
     # ============================================================================
     # Konfiguration der Verbindungen
     # ============================================================================
     st.subheader(":material/share: Verbindungen konfigurieren", help="Fügen Sie Verbindungen zwischen Gelenken hinzu.")
     
-    # aktuelle Verbindungen anzeigen
-    if st.session_state["links"]:
-        with st.expander("**Aktuelle Verbindungen anzeigen**", expanded=False, icon = ":material/visibility:"):
-            for link in st.session_state["links"]:
-                st.write(f"Gelenk {link[0] + 1} - Gelenk {link[1] + 1}")
-
-            # Ausgabe, wie viele Links für gültige Konfiguration benötigt werden
-            required = required_links() - len(st.session_state["links"])
-            st.info(f"**Anzahl noch benötigter Verbindungen: *{required}***")
-
-
-    joint_indices = [f"Gelenk {i + 1}" for i in range(len(st.session_state["joints"]))]
-    joint1 = st.selectbox("**Verbindung von**", options = joint_indices, key="link_joint1", index = None, placeholder = "Gelenk auswählen")
-    joint2 = st.selectbox("**zu**", options = joint_indices, key="link_joint2", index = None, placeholder = "Gelenk auswählen")
-
-    if st.button("**Verbindung hinzufügen**", icon = ":material/add:"):
-        j1 = joint_indices.index(joint1)
-        j2 = joint_indices.index(joint2)
-        new_link = tuple(sorted((j1, j2)))
-        existing_link = new_link in st.session_state["links"]
-
-        if not existing_link and j1 != j2:
-            st.session_state["links"].append(new_link)
-            st.success(f"Verbindung zwischen Gelenk {joint1} und Gelenk {joint2} hinzugefügt.")
-            time.sleep(1)
-            st.rerun()
-        else:
-            st.warning("Ungültige Verbindung oder Verbindung bereits vorhanden.")
-            time.sleep(1)
-            st.rerun()
-
-    if st.button("**Letzte *ungeschützte* Verbindung entfernen**", icon = ":material/remove:"):
-        # Suche von hinten nach vorn (um letzte ungeschützte Verbindung zu finden)
-        found_unprotected = False
-        for i in range(len(st.session_state["links"]) - 1, -1, -1): # Rückwerts-Schleife range(start, stop, step)
-            link = st.session_state["links"][i]
-            if link not in st.session_state["protected_links"]:
-                st.session_state["links"].pop(i)
-                st.success(f"Verbindung {link} erfolgreich entfernt.")
-                found_unprotected = True
-                break
-        if not found_unprotected:
-            st.warning("Keine ungeschützte Verbindung gefunden.")
-        
-        time.sleep(1)
-        st.rerun()
+    links_editor()
     
     st.divider()
     # ============================================================================
@@ -421,56 +595,42 @@ with col1:
 
     if st.button("**Speichern**", icon=":material/save:", help="Mechanismus-Konfiguration wird vor dem Speichern validiert. Ungültige Konfigurationen können nicht gespeichert werden."):
         if not config_name.strip():
-            st.error("Bitte geben Sie einen Namen für die Konfiguration ein.")
-            time.sleep(2)
-            st.rerun()
+            st.toast("Bitte geben Sie einen Namen für die Konfiguration ein.", icon="❌")
         else:
             # Mechanismus-Ojekt aus Session-States erstellen
             # Joint und Link Objekte erzeugen
-            joint_objects = []
-            for j in st.session_state["joints"]:
-                j_obj = Joint(
-                    x = j["x"],
-                    y = j["y"],
-                    joint_type = j["type"],
-                    center = j["center"],
-                    radius = j["radius"]
-                )
-                joint_objects.append(j_obj)
-
-            link_objects = []
-            for (start_idx, end_idx) in st.session_state["links"]:
-                link_obj = Link(
-                    start_joint = joint_objects[start_idx],
-                    end_joint = joint_objects[end_idx],
-                    protected = False if (start_idx, end_idx) not in st.session_state["protected_links"] else True  
-                )
-                link_objects.append(link_obj)
+            joint_objects = [
+                Joint(x = j["x"], y = j["y"], joint_type = j["type"], center = j["center"], radius = j["radius"])
+                for j in st.session_state["joints"]
+            ]
+
+            protected_links = st.session_state["protected_links"]
+            link_objects = [
+                Link(start_joint = joint_objects[start_idx], end_joint = joint_objects[end_idx],
+                     protected = (start_idx, end_idx) in protected_links)
+                for (start_idx, end_idx) in st.session_state["links"]
+            ]
 
             # Validierung der Mechanismus-Konfiguration
             valid, msg = mechanism_is_valid(joint_objects, link_objects)
 
             if not valid:
-                st.error(f"{msg}")
-                time.sleep(3)
-                st.rerun()
+                st.toast(f"{msg}", icon="❌")
 
             else:
                 # Namensduplikate verhindern
-                all_mechanisms = Mechanism.find_all_mechanisms()
-                name_conflict = [m for m in all_mechanisms if m["name"] == config_name
-                                and m["id"] != st.session_state["current_mech_id"]]
+                all_mechanisms = cached_find_all_mechanisms()
+                current_id = st.session_state["current_mech_id"]
+                has_conflict = any(m["name"] == config_name and m["id"] != current_id for m in all_mechanisms)
                 
                 # Fehlermeldung bei Namenskonflikt
-                if name_conflict:
-                    st.error(f"Name \"{config_name}\" bereits vergeben. Bitte wählen Sie einen anderen Namen.")
-                    time.sleep(2)
-                    st.rerun()
+                if has_conflict:
+                    st.toast(f"Name \"{config_name}\" bereits vergeben. Bitte wählen Sie einen anderen Namen.", icon="❌")
                 
                 # Update von existierendem Mechanismus
-                if st.session_state["current_mech_id"] and config_name == st.session_state["current_mech_name"]:
+                elif st.session_state["current_mech_id"] and config_name == st.session_state["current_mech_name"]:
                     
-                    db_mech = Mechanism.load_mechanism(st.session_state["current_mech_id"])
+                    db_mech = cached_load_mechanism(st.session_state["current_mech_id"])
                     
                     new_mech = Mechanism(
                         name = config_name,
@@ -484,20 +644,22 @@ with col1:
                     if db_mech is None:
                         # Fallback, falls Mechanismus nicht in DB gefunden wird, wird aktuelle Konfiguration gespeichert
                         new_mech.save_mechanism()
+                        clear_mechanism_caches()
                         mech = new_mech
-                        st.success(f"Gültige Konfiguration. Mechanismus \"{mech.name}\" neu gespeichert.")
+                        st.toast(f"Gültige Konfiguration. Mechanismus \"{mech.name}\" neu gespeichert.", icon="✅")
 
                     else:
                         # Mechanismus-Objekte vergleichen
                         if new_mech == db_mech:
                             # keine Änderungen -> Mechanismus nicht speichern
                             mech = db_mech
-                            st.warning("Keine Änderungen in der Konfiguration. Mechanismus wird nicht aktualisiert.")
+                            st.toast("Keine Änderungen in der Konfiguration. Mechanismus wird nicht aktualisiert.", icon="⚠️")
                         else:
                             # Wenn Änderungen, dann speichern
                             new_mech.save_mechanism()
+                            clear_mechanism_caches()
                             mech = new_mech
-                            st.success(f"Gültige Konfiguration. Mechanismus \"{mech.name}\" erfolgreich aktualisiert. Neue Version: {mech.version}")
+                            st.toast(f"Gültige Konfiguration. Mechanismus \"{mech.name}\" erfolgreich aktualisiert. Neue Version: {mech.version}", icon="✅")
 
                     # Session-States aktualisieren (gespeicherter Mechanismus wird geladen)
                     st.session_state["current_mech_id"] = mech.id
@@ -508,13 +670,13 @@ with col1:
                     label_for_selectbox = f"{mech.name} (Version {mech.version})"
                     st.session_state["load_config"] = label_for_selectbox
 
-                    time.sleep(3)
                     st.rerun()
                 
                 # Neuen Mechanismus speichern
                 else:
                     mech = Mechanism(name = config_name, joints = joint_objects, links = link_objects)
                     mech.save_mechanism()
+                    clear_mechanism_caches()
 
                     # Session-States aktualisieren (gespeicherter Mechanismus wird geladen)
                     st.session_state["current_mech_id"] = mech.id
@@ -525,9 +687,7 @@ with col1:
                     label_for_selectbox = f"{mech.name} (Version {mech.version})"
                     st.session_state["load_config"] = label_for_selectbox
 
-                    st.success(f"Gültige Konfiguration. Mechanismus \"{mech.name}\" erfolgreich gespeichert.")
-
-                    time.sleep(3)
+                    st.toast(f"Gültige Konfiguration. Mechanismus \"{mech.name}\" erfolgreich gespeichert.", icon="✅")
                     st.rerun()
 
     st.divider()
@@ -536,7 +696,7 @@ with col1:
     # ============================================================================
     st.subheader(":material/open_in_browser: Mechanismus laden", help="Laden Sie eine gespeicherte Konfiguration.")
 
-    mechanisms = Mechanism.find_all_mechanisms()
+    mechanisms = cached_find_all_mechanisms()
     if mechanisms:
         # Mapping für die Selectbox (Anzeige: Name (Version)) -> ID
         mech_map = {f"{m["name"]} (Version {m["version"]})": m["id"] for m in mechanisms}
@@ -546,35 +706,27 @@ with col1:
             if chosen_mechanism != "Keine":
                 if st.button("**Laden**", icon = ":material/open_in_browser:"):
                     mechanism_id = mech_map[chosen_mechanism]
-                    mechanism = Mechanism.load_mechanism(mechanism_id)
+                    mechanism = cached_load_mechanism(mechanism_id)
                     if not mechanism:
-                        st.error("Mechanismus nicht gefunden.")
-                        time.sleep(2)
-                        st.rerun()
+                        st.toast("Mechanismus nicht gefunden.", icon="❌")
                     else:
                         # Session-States aktualisieren
                         st.session_state["current_mech_id"] = mechanism_id
                         st.session_state["current_mech_name"] = mechanism.name
                         st.session_state["current_mech_version"] = mechanism.version
-                        # Joint und Link Session States
-                        st.session_state["joints"] = []
-                        st.session_state["links"] = []
-                        st.session_state["protected_links"] = set()
-                        for joint in mechanism.joints:
-                            st.session_state["joints"].append({
-                                "x": joint.x,
-                                "y": joint.y,
-                                "type": joint.type,
-                                "center": joint.center,
-                                "radius": joint.radius
-                            })
-                        for link in mechanism.links:
-                            start_idx = mechanism.joints.index(link.start_joint)
-                            end_idx = mechanism.joints.index(link.end_joint)
-                            new_link = tuple(sorted((start_idx, end_idx)))
-                            st.session_state["links"].append(new_link)
-                            if link.protected:
-                                st.session_state["protected_links"].add(new_link)
+                        # Joint und Link Session States (Werte kopieren, das gecachte Mechanismus-Objekt bleibt unverändert)
+                        st.session_state["joints"] = [
+                            {"x": joint.x, "y": joint.y, "type": joint.type,
+                             "center": list(joint.center) if joint.center else None, "radius": joint.radius}
+                            for joint in mechanism.joints
+                        ]
+                        # Gelenk-Objekt -> Index einmalig aufbauen (statt list.index pro Verbindung)
+                        idx_map = {id(joint): i for i, joint in enumerate(mechanism.joints)}
+                        link_keys = [_edge(idx_map[id(link.start_joint)], idx_map[id(link.end_joint)])
+                                     for link in mechanism.links]
+                        st.session_state["links"] = dict.fromkeys(link_keys)
+                        st.session_state["protected_links"] = {key for key, link in zip(link_keys, mechanism.links)
+                                                               if link.protected}
 
                         # Drehpunkt finden (für Anzeige nach Laden von Mechanismus)
                         for circ_idx, circ_joint in enumerate(st.session_state["joints"]):
@@ -593,8 +745,7 @@ with col1:
 
                         st.session_state["load_interaction"] = False
 
-                        st.success(f"Mechanismus \"{mechanism.name}\" erfolgreich geladen.")
-                        time.sleep(2)
+                        st.toast(f"Mechanismus \"{mechanism.name}\" erfolgreich geladen.", icon="✅")
                         st.rerun()
 
             elif chosen_mechanism == "Keine":
@@ -616,7 +767,7 @@ with col1:
     # ============================================================================
     st.subheader(":material/delete: Mechanismus löschen", help="Löschen Sie eine gespeicherte Konfiguration.")
 
-    saved_configs = Mechanism.find_all_mechanisms()
+    saved_configs = cached_find_all_mechanisms()
     if saved_configs:
         # Mapping für die Selectbox (Anzeige: Name (Version)) -> ID
         configs_map = {f"{m["name"]} (Version {m["version"]})": m["id"] for m in saved_configs}
@@ -633,8 +784,8 @@ with col1:
                     reset_to_standard()
                     # Mechanismus löschen
                     Mechanism.delete_mechanism(mechanism_id)
-                    st.success(f"Konfiguration \"{selected_config_to_delete}\" erfolgreich gelöscht.")
-                    time.sleep(2)
+                    clear_mechanism_caches()
+                    st.toast(f"Konfiguration \"{selected_config_to_delete}\" erfolgreich gelöscht.", icon="✅")
                     st.rerun()
 
     st.divider()
@@ -644,9 +795,8 @@ with col1:
     # Datenbank exportieren
     st.subheader(":material/import_export: Datenbank exportieren", help="Exportieren Sie die aktuelle Datenbank, um ihre Daten für eine neue Sitzung wiederherzustellen.")
     if st.button("**Backup erstellen**", icon=":material/cloud_download:", help="Erstellen Sie ein Backup der aktuellen Datenbank."):
-        # DB schließen
+        # DB schließen (close() schließt die Datei synchron, ein Warten ist nicht nötig)
         db_connector.close()
-        time.sleep(0.1)
 
         # Backup-Datei erstellen
         with open(db_connector.path, "rb") as f:
@@ -666,15 +816,14 @@ with col1:
 
     if upload_file is not None:
         if st.button("**Datenbank überschreiben**", icon=":material/backup_table:", help="Überschreiben Sie die aktuelle Datenbank mit der hochgeladenen Datei."):
-            # DB schließen
+            # DB schließen (close() schließt die Datei synchron, ein Warten ist nicht nötig)
             db_connector.close()
-            time.sleep(0.1)
             # Datei überschreiben
             with open(db_connector.path, "wb") as f:
                 f.write(upload_file.getvalue())
+            clear_mechanism_caches()
 
-            st.success("Datenbank erfolgreich überschrieben.")
-            time.sleep(2)
+            st.toast("Datenbank erfolgreich überschrieben.", icon="✅")
             st.rerun()
     # ============================================================================
     # Anzeige, ob Mechanismus geladen
@@ -695,9 +844,7 @@ with col2:
                  help="Hier wird die aktuelle Mechanismus-Konfiguration visualisiert. Das gilt auch für geladene Mechanismen."
     )
     
-    fig, ax = plt.subplots()
-    Visualizer.plot_configuration(st.session_state["joints"], st.session_state["links"], ax=ax)
-    st.pyplot(fig, use_container_width=False) 
+    preview_panel()
 
     st.divider()
     # ============================================================================
@@ -707,84 +854,68 @@ with col2:
                  help="Simulieren Sie die Kinematik eines Mechanismus. Die Simulation wird als GIF-Datei ausgegeben."
     )
     
-    all_mechs = Mechanism.find_all_mechanisms()
+    all_mechs = cached_find_all_mechanisms()
     if not all_mechs:
         st.info("Keine gespeicherten Mechanismen gefunden.")
     
     mech_map = {f"{m['name']} (Version {m['version']})": m["id"] for m in all_mechs}
+    mech_versions = {f"{m['name']} (Version {m['version']})": m["version"] for m in all_mechs}
 
     # Mechanismus auswählen
     chosen_label = st.selectbox("**Wähle eine gespeicherte Konfiguration aus**", options=["Keine"] + list(mech_map.keys()))
 
+    # Mechanismus-Objekt nur bei geänderter Auswahl neu laden und für die Sitzung merken
+    if chosen_label != st.session_state.get("sim_config"):
+        st.session_state["sim_config"] = chosen_label
+        st.session_state["sim_mechanism"] = cached_load_mechanism(mech_map[chosen_label]) if chosen_label in mech_map else None
+
     if chosen_label != "Keine":
-        steps = st.number_input("**Schrittweite Drehwinkel**", value=100, step=1, min_value=100, max_value=1000, key="step_angle", 
-                        help="Anzahl der Schritte für die Berechnung der Kinematik. Je höher der Wert, desto genauer die Simulation. Feinere Schrittweite erhöht die Berechnungszeit.")
+        steps = st.slider("**Anzahl Frames (Schritte pro Umdrehung)**", min_value=20, max_value=1000, value=60, step=1, key="step_angle", 
+                        help="Anzahl der Schritte für die Berechnung der Kinematik und Frames im GIF. Je höher der Wert, desto genauer die Simulation. "
+                        "Mehr Frames erhöhen die Berechnungszeit und die Dauer der GIF-Erstellung linear; für die Animation reichen meist 60 Frames.")
         # st.info(f"{steps} Schritte entsprechen {(360 / steps):.2f}° pro Frame.")
         if st.button("**Simulation ausführen**", icon=":material/play_arrow:"):
-            # Mechanismus laden:
             mechanism_id = mech_map[chosen_label]
-            mech_object = Mechanism.load_mechanism(mechanism_id)
-            if not mech_object:
+            # Mechanismus (nur lesend) für GIF und CSV
+            mech_object = st.session_state["sim_mechanism"]
+            result = run_simulation(mechanism_id, mech_versions[chosen_label], steps, mech_object) if mech_object else None
+            if not result:
+                # Fehlermeldung bleibt bis zur nächsten Interaktion sichtbar (kein blockierendes sleep + rerun)
                 st.error("Mechanismus konnte nicht geladen werden.")
-                time.sleep(2)
-                st.rerun()
             else:
-                # Prüfung, ob Kinematik (mit dieser Schrittweite) schon berechnet wurde (mechanism_kinematics)
-                theta_range, trajectories = mech_object.load_kinematics(mechanism_id=mech_object.id, mechanism_version=mech_object.version, steps=steps)
-                if theta_range and trajectories and len(theta_range) == steps:
+                theta_range, trajectories, fail_count, from_db, gif_bytes, csv_bytes = result
+                if from_db:
                     st.info(f"Kinematik-Eintrag für gewählten Mechanismus und Schrittweite existiert bereits. Lade Daten ...")
+                elif not fail_count:
+                    st.success("Kinematik erfolgreich berechnet und in Datenbank gespeichert.")
                 else:
-                    # Keine Kinematikdaten vorhanden -> Berechnung durchführen
-                    st.info("Keinen Kinematik-Eintrag für gewählten Mechanismus und Schrittweite gefunden. Berechne Simulation ...")
-                    # Startwinkel
-                    theta_range = mech_object.compute_theta_range(steps=steps)
-                    # Kinematik
-                    trajectories, fail_count = mech_object.kinematics(theta_range)
-                    # Kinematik in DB speichern
-                    if not fail_count:
-                        mech_object.save_kinematics(theta_range, trajectories, steps)
-                        st.success("Kinematik erfolgreich berechnet und in Datenbank gespeichert.")
-                    else:
-                        st.info(f"Kinematik nicht in Datenbank gespeichert, da {fail_count} von {steps} Frames fehlerhaft berechnet wurden.")
-                        st.info("Simulation wird trotzdem ausgeführt.")
-                
-                # GIF erstellen
-                gif_path = Visualizer.create_gif(
-                    thetas=theta_range,
-                    trajectories=trajectories,
-                    joints=mech_object.joints,
-                    links=mech_object.links
-                )
-
-                # CSV-Datei erstellen
-                csv_file = mech_object.save_kinematics_to_csv(theta_range=theta_range, trajectories=trajectories)
+                    st.info(f"Kinematik nicht in Datenbank gespeichert, da {fail_count} von {steps} Frames fehlerhaft berechnet wurden.")
+                    st.info("Simulation wird trotzdem ausgeführt.")
 
                 st.subheader(":material/gif_box: Simulation als GIF:", divider="rainbow")
-                image = st.image(gif_path, use_container_width=True)
+                image = st.image(gif_bytes, use_container_width=True)
 
                 if image:
                     if st.button("**Simulation beenden**", icon=":material/stop:", help="Simulation wird beendet und Seite wird neu geladen."):
                         st.rerun()
 
                 # GIF-Datei (Simulation) herunterladen
-                with open(gif_path, "rb") as gif_data:
-                    st.download_button(
-                        label="**GIF herunterladen**",
-                        data=gif_data,
-                        file_name="simulation.gif",
-                        mime="image/gif",
-                        icon=":material/download:"
-                    )
+                st.download_button(
+                    label="**GIF herunterladen**",
+                    data=gif_bytes,
+                    file_name="simulation.gif",
+                    mime="image/gif",
+                    icon=":material/download:"
+                )
                     
                 # CSV-Datei (Kinematikdaten) herunterladen
-                with open(csv_file, "rb") as csv_data:
-                    st.download_button(
-                        label="**Simulationsergebnisse als CSV herunterladen**",
-                        data=csv_data,
-                        file_name="Coords_results.csv",
-                        mime="text/csv",
-                        icon=":material/download:"
-                    )
+                st.download_button(
+                    label="**Simulationsergebnisse als CSV herunterladen**",
+                    data=csv_bytes,
+                    file_name="Coords_results.csv",
+                    mime="text/csv",
+                    icon=":material/download:"
+                )
 
     st.divider()
     # ======================================================
@@ -794,7 +925,7 @@ with col2:
                 help="Berechnung der Vorwärtsbewegungsgeschwindigkeit eines Strandbeestbeins, mit Angabe des maximalen Abstands des Fußes zum Boden (Fuß angehoben)."
     )
             
-    all_mechs = Mechanism.find_all_mechanisms()
+    all_mechs = cached_find_all_mechanisms()
     strandbeest_options = {f"{m['name']} (Version {m['version']})": m["id"] for m in all_mechs if "Strandbeest" in m["name"]}
 
     if not strandbeest_options:
@@ -812,7 +943,7 @@ with col2:
                 st.error("Mechanismus konnte nicht geladen werden.")
             else:
                 theta_range, trajectories = Mechanism.load_kinematics(mechanism_id, mechanism.version, steps=None)
-                if not trajectories:
+                if trajectories is None:
                     st.warning("Keine Kinematik Daten gefunden.")
                 else:
                     # Gelenkauswahl
@@ -851,6 +982,7 @@ with col2:
                     # Berechnung ausführen
                     if st.button("**Berechnung starten**"):
                         try:
+                            from movement_speed import StrandbeestSpeed
                             strandbeest_vel = StrandbeestSpeed(mechanism_id, joint_index, revolutions_per_minute, theta_range, trajectories, ground_contact_tolerance)
                             v_max, stride_length, delta_t = strandbeest_vel.calculate_max_speed()
 
@@ -870,7 +1002,6 @@ with col2:
                             st.info(f"**Bodenkontaktzeit:** {delta_t:.2f} s")
                                             
                             # Visualisierung vom Bodenkontakt mit welchem gerechnet wurde
-                            fig, ax = plt.subplots()
                             fig = strandbeest_vel.plot_ground_contact()
                             st.pyplot(fig, use_container_width=False)
 
@@ -885,7 +1016,7 @@ with col2:
                 help="Download eines LaTex Dokuments mit den Gelenken und Verbindungen gelistet und einer Grafik der Ausgangsposition"
     )
 
-    mechanism_latex = Mechanism.find_all_mechanisms()
+    mechanism_latex = cached_find_all_mechanisms()
     if not mechanism_latex:
         st.info("Kein Mechanismus in der DB gefunden")
     else:
@@ -903,6 +1034,7 @@ with col2:
             mechanism_latex_doc = Mechanism.load_mechanism(mechanism_id)
             if mechanism_latex_doc:
                 # LaTex Dokument erstellen
+                from markup_language import MechanismLatex
                 latex_doc = MechanismLatex.create_document(mechanism_latex_doc)
                 # Download-Button anzeigen
                 st.download_button(
@@ -917,28 +1049,29 @@ with col2:
                 st.error("Konnte nicht geladen werden.")
 
 # ================================================================================
-# Debugging (Session States anzeigen)
+# Debugging (Session States anzeigen, nur mit gesetzter Umgebungsvariable MECH_DEBUG)
 # ================================================================================
-print("==================== Session States: ====================")
-print("Sperr-Logik:")
-print("locked:", st.session_state["locked"])
-print("prev_locked:", st.session_state["prev_locked"])
-print("---------------------------------------------------------")
-print("geladener Mechanismus:")
-print("ID:", st.session_state["current_mech_id"])
-print("Name:", st.session_state["current_mech_name"])
-print("Version:", st.session_state["current_mech_version"])
-print("---------------------------------------------------------")
-print("Einheit:")
-print(st.session_state["unit"])
-print("---------------------------------------------------------")
-print("Joints:")
-for i in range(len(st.session_state["joints"])):
-    print(st.session_state["joints"][i])
-print("---------------------------------------------------------")
-print("Links:")
-for i in range(len(st.session_state["links"])):
-    print(st.session_state["links"][i])
-print(f"Protected: {st.session_state["protected_links"]}")
-print("---------------------------------------------------------")
-print(f"Mechanismus laden: {st.session_state["load_interaction"] if st.session_state.get("load_interaction") else False}")
\ No newline at end of file
+if os.environ.get("MECH_DEBUG"):
+    logger.debug("\n".join([
+        "==================== Session States: ====================",
+        "Sperr-Logik:",
+        f"locked: {st.session_state["locked"]}",
+        f"prev_locked: {st.session_state["prev_locked"]}",
+        "---------------------------------------------------------",
+        "geladener Mechanismus:",
+        f"ID: {st.session_state["current_mech_id"]}",
+        f"Name: {st.session_state["current_mech_name"]}",
+        f"Version: {st.session_state["current_mech_version"]}",
+        "---------------------------------------------------------",
+        "Einheit:",
+        str(st.session_state["unit"]),
+        "---------------------------------------------------------",
+        "Joints:",
+        *(str(joint) for joint in st.session_state["joints"]),
+        "---------------------------------------------------------",
+        "Links:",
+        *(str(link) for link in st.session_state["links"]),
+        f"Protected: {st.session_state["protected_links"]}",
+        "---------------------------------------------------------",
+        f"Mechanismus laden: {st.session_state.get("load_interaction") or False}",
+    ]))
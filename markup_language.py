@@ -31,87 +31,93 @@ class MechanismLatex:
 \begin{document}
 """
                         
+        # Teile des Dokuments werden in einer Liste gesammelt und am Ende einmal mit "".join verbunden
+        # (statt wiederholtem string + string, das bei jedem Schritt den ganzen bisherigen Text kopiert)
+        parts = [header]
+
         # Mechanismus Details
-        title = r"""\section*{Stueckliste und Visualisierung von: %s}""" % mechanism.name
-        details = r"""
+        parts.append(r"""\section*{Stueckliste und Visualisierung von: %s}""" % mechanism.name)
+        parts.append(r"""
 \textbf{ID:} %s \\
 \textbf{Version:} %s\\
-""" % (mechanism.id, mechanism.version) # wird dem Platzhalter %s (für str) übergeben
-        
+""" % (mechanism.id, mechanism.version)) # wird dem Platzhalter %s (für str) übergeben
+
+        # Gelenk-Indizes (1-basiert) der Verbindungen einmalig über die Objekt-ID bestimmen
+        # (None, falls ein Gelenk nicht zum Mechanismus gehört)
+        idx_map = {id(joint): idx + 1 for idx, joint in enumerate(mechanism.joints)}
+        link_indices = [(idx_map.get(id(link.start_joint)), idx_map.get(id(link.end_joint))) for link in mechanism.links]
+
         # Tabelle mit Gelenke erstellen
         # Zwischenüberschrift
-        joints_section = r"""\subsection*{Gelenke} """
+        parts.append(r"""\subsection*{Gelenke} """)
         # Tabellen erstellen
-        joints_section = joints_section + r"""
+        parts.append(r"""
 \begin{table}[h]
     \centering
     \begin{tabular}{|c|c|c|c|c|}
-    \toprule """
-        joints_section = joints_section + r""" 
-        Gelenk Nr. & x & y & Typ & Drehmittelpunkt und Radius \\ \midrule """
+    \toprule """)
+        parts.append(r""" 
+        Gelenk Nr. & x & y & Typ & Drehmittelpunkt und Radius \\ \midrule """)
         for idx, joint in enumerate(mechanism.joints):
             circle_movement = ""
             if joint.type == "Kreisbahnbewegung" and joint.center:
-                circle_movement = "Center: (%.2f, %.2f), Radius: %.2f" % (joint.center[0], joint.center[1], joint.radius)
-            joints_section = joints_section + "%d & %.2f & %.2f & %s & %s \\\\ \\hline\n" % (idx+1, joint.x, joint.y, joint.type, circle_movement)
-        joints_section = joints_section + r"""  
+                circle_movement = f"Center: ({joint.center[0]:.2f}, {joint.center[1]:.2f}), Radius: {joint.radius:.2f}"
+            parts.append(f"{idx + 1} & {joint.x:.2f} & {joint.y:.2f} & {joint.type} & {circle_movement} \\\\ \\hline\n")
+        parts.append(r"""  
     \end{tabular}
-\end{table} """
+\end{table} """)
 
-        
         # Zwischenüberschrift Verbindungen
-        links_section = r"""
-\subsection*{Verbindungen} """
+        parts.append(r"""
+\subsection*{Verbindungen} """)
 
         # Tabelle mit Verbindungen
-        links_section = links_section + r""" 
+        parts.append(r""" 
 \begin{table}[h]
     \centering
     \begin{tabular}{|c|c|c|c|}
-    \toprule """
-        links_section = links_section + r""" 
-        Verbindung Nr. & Start Gelenk & End Gelenk & Laenge \\ \midrule """
-        for idx, link in enumerate(mechanism.links):
-            try:
-                start_index = mechanism.joints.index(link.start_joint) + 1
-                end_index = mechanism.joints.index(link.end_joint) + 1
-            except ValueError:
+    \toprule """)
+        parts.append(r""" 
+        Verbindung Nr. & Start Gelenk & End Gelenk & Laenge \\ \midrule """)
+        for idx, (link, (start_index, end_index)) in enumerate(zip(mechanism.links, link_indices)):
+            if start_index is None or end_index is None:
                 start_index, end_index = "/", "/"
-            links_section = links_section + "%d & %s & %s & %.2f \\\\ \\hline\n" %(idx+1, start_index, end_index, link.length if link.length is not None else 0)
-        links_section = links_section + r""" 
+            length = link.length if link.length is not None else 0
+            parts.append(f"{idx + 1} & {start_index} & {end_index} & {length:.2f} \\\\ \\hline\n")
+        parts.append(r""" 
     \end{tabular} 
-\end{table} """
+\end{table} """)
 
         # Mechanismus zeichnen
-        tikz_section = r"""
+        parts.append(r"""
 \subsection*{Grafik vom Mechanismus}
 \resizebox{\textwidth}{!}{
-    \begin{tikzpicture} """
+    \begin{tikzpicture} """)
         for idx, joint in enumerate(mechanism.joints):
             # Zeichnet alle Knoten mit Beschriftung
-            tikz_section = tikz_section + r"""
-        \node[joint] (J%d) at (%.2f, %.2f); """ % (idx+1, joint.x, joint.y)
+            parts.append(f"""
+        \\node[joint] (J{idx + 1}) at ({joint.x:.2f}, {joint.y:.2f}); """)
             if joint.type == "Kreisbahnbewegung" and joint.center is not None and joint.radius is not None:
-                tikz_section = tikz_section + r"""
+                parts.append(f"""
         # Kreis zeichnen - strichliert in blau
-        \draw[dashed, blue] (%.2f, %.2f) circle (%.2f); """ % (joint.center[0], joint.center[1], joint.radius)
+        \\draw[dashed, blue] ({joint.center[0]:.2f}, {joint.center[1]:.2f}) circle ({joint.radius:.2f}); """)
     
         # Zeichnen der Verbindungen
-        for idx, link in enumerate(mechanism.links):
-            start_index = mechanism.joints.index(link.start_joint) + 1
-            end_index = mechanism.joints.index(link.end_joint) + 1
-            tikz_section = tikz_section + r"""
-        \draw (J%d) -- (J%d); """ % (start_index, end_index)
+        for start_index, end_index in link_indices:
+            if start_index is None or end_index is None:
+                continue
+            parts.append(f"""
+        \\draw (J{start_index}) -- (J{end_index}); """)
         
-        tikz_section = tikz_section + r"""
+        parts.append(r"""
     \end{tikzpicture} 
-}"""
+}""")
     
         # LaTex Dokument Ende
-        doc_end = r""" 
-\end{document} """
+        parts.append(r""" 
+\end{document} """)
 
-        latex_document = header + title + details + joints_section + links_section + tikz_section + doc_end
+        latex_document = "".join(parts)
 
         return latex_document
 
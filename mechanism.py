@@ -6,11 +6,27 @@ from database import DatabaseConnector
 from tinydb import Query
 import networkx as nx # zur Validierung der Konnektivität des Mechanismus
 import uuid # zur Generierung von eindeutiger Mechanismus-ID
-import csv  
+import hashlib # zur Erzeugung eines Geometrie-Hashs (Kinematik-Cache)
+import io # CSV-Export in den Speicher (ohne temporäre Datei)
+import base64 # Trajektorien als Binärdaten (float32) in der Datenbank
+import functools # Cache für geladene Kinematik-Daten
 
 # =================================================================================================
 # Joint und Link Klassen
 # =================================================================================================
+# Datentyp für alle Gelenke eines Mechanismus als strukturiertes NumPy-Array (eine Zeile je Gelenk,
+# fehlender Drehpunkt/Radius = NaN). Grundlage für Geometrie-Hash und vektorisierte Berechnungen.
+JOINT_DTYPE = np.dtype([("x", "f8"), ("y", "f8"), ("type", "U20"), ("cx", "f8"), ("cy", "f8"), ("r", "f8")])
+
+# Toleranzen für den Vergleich von Gleitkomma-Geometrie (Koordinaten, Radien, Längen) in Mechanism.__eq__,
+# damit Rundungsunterschiede im letzten Bit nicht als Änderung des Mechanismus gelten
+GEOMETRY_RTOL = 1e-9
+GEOMETRY_ATOL = 1e-9
+# Nachkommastellen, auf die Gleitkomma-Werte vor dem Bilden des Geometrie-Hashs gerundet werden. Das Raster (1e-6)
+# muss deutlich gröber als das auszugleichende Rauschen (< 1e-9) sein, sonst ändert schon ein Wert knapp an einer
+# Rundungsgrenze den Hash. Feiner als 1e-6 ist nicht nötig, die Trajektorien werden ohnehin als float32 gespeichert.
+GEOMETRY_HASH_DECIMALS = 6
+
 class Joint:
     """
     Repräsentiert ein einzelnes Gelenk.
@@ -109,9 +125,11 @@ def mechanism_is_valid(joints: list, links: list):
     for i, j in enumerate(joints):
         G.add_node(i)
     # Gestelle / Links basierend auf Indizes der Gelenke als Kanten hinzufügen
+    # (Index über die Objekt-ID statt joints.index, das jedes Gelenk per __eq__ vergleicht)
+    idx_map = {id(j): i for i, j in enumerate(joints)}
     for link in links:
-        start_idx = joints.index(link.start_joint)
-        end_idx = joints.index(link.end_joint)
+        start_idx = idx_map[id(link.start_joint)]
+        end_idx = idx_map[id(link.end_joint)]
         G.add_edge(start_idx, end_idx)
 
     # Konnektivität prüfen
@@ -123,6 +141,92 @@ def mechanism_is_valid(joints: list, links: list):
     # ---------------------------------------------------------
     return True, "Gültiger Mechanismus"
 
+# =================================================================================================
+# Fehlerfunktion der Optimierung und deren Jacobi-Matrix (arbeiten nur auf Arrays)
+# =================================================================================================
+def link_residual(free_positions, xy, free_idx, link_pairs, link_lens):
+    """
+    Fehlerfunktion für least_squares ohne Zugriff auf Joint- oder Link-Objekte:
+    free_positions: [x1, y1, x2, y2, ...] aller Frei beweglichen Gelenke
+    xy: (n, 2)-Array aller Gelenkpositionen (die Zeilen free_idx werden überschrieben)
+    link_pairs, link_lens: Gelenk-Indizes [start, end] und Soll-Längen der Links
+    Gibt die Abweichungen der aktuellen Link-Längen von den Soll-Längen zurück.
+    """
+    xy[free_idx] = np.reshape(free_positions, (-1, 2))
+
+    delta = xy[link_pairs[:, 1]] - xy[link_pairs[:, 0]]
+    current_lengths = np.hypot(delta[:, 0], delta[:, 1])
+
+    return current_lengths - link_lens
+
+def link_jacobian(free_positions, xy, free_idx, link_pairs, link_lens):
+    """
+    Analytische Jacobi-Matrix von link_residual() (gleiche Argumente) für least_squares:
+    Zeile k = Link k, Spalten = [x1, y1, x2, y2, ...] der Frei beweglichen Gelenke.
+    Die Ableitung der Länge nach dem Endgelenk ist der Einheitsvektor des Links, nach dem Startgelenk
+    dessen Negatives. Fixierte Gelenke und das Kreisbahngelenk haben keine Spalte.
+    Ersetzt die Finite-Differenzen-Näherung (2 * Anzahl freier Gelenke zusätzliche Auswertungen).
+    """
+    xy[free_idx] = np.reshape(free_positions, (-1, 2))
+
+    delta = xy[link_pairs[:, 1]] - xy[link_pairs[:, 0]]
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    # Einheitsvektoren (Links der Länge 0 haben keine definierte Richtung -> Ableitung 0)
+    unit = np.divide(delta, lengths[:, None], out=np.zeros_like(delta), where=lengths[:, None] > 0)
+
+    # Spalten-Position jedes Gelenks in free_positions (-1 = kein freies Gelenk)
+    free_col = np.full(len(xy), -1, dtype=np.intp)
+    free_col[free_idx] = np.arange(len(free_idx))
+
+    jac = np.zeros((len(link_pairs), 2 * len(free_idx)))
+    rows = np.arange(len(link_pairs))
+    for sign, joint_idx in ((1.0, link_pairs[:, 1]), (-1.0, link_pairs[:, 0])):
+        col = free_col[joint_idx]
+        mask = col >= 0
+        jac[rows[mask], 2 * col[mask]] += sign * unit[mask, 0]
+        jac[rows[mask], 2 * col[mask] + 1] += sign * unit[mask, 1]
+
+    return jac
+
+def _solve_frame(x0, xy, free_idx, link_pairs, link_lens, max_iter=20):
+    """
+    Levenberg-Marquardt für einen einzelnen Frame (kleines Gleichungssystem: wenige Links und freie Gelenke).
+    Nutzt link_residual() und link_jacobian() direkt, ohne den Overhead eines least_squares-Aufrufs.
+    Gibt (x, konvergiert) zurück - konvergiert, wenn die Längenfehler aller Links mit mindestens einem
+    frei beweglichen Gelenk praktisch 0 sind (die übrigen Links, z.B. Drehpunkt-Kreisbahngelenk, sind konstant).
+    """
+    tol = 1e-10 * max(1.0, float(np.max(link_lens, initial=0.0)))
+    damping = 1e-3
+    active = np.isin(link_pairs, free_idx).any(axis=1)
+
+    x = np.array(x0, dtype=np.float64)
+    residual = link_residual(x, xy, free_idx, link_pairs, link_lens)
+    cost = residual @ residual
+    identity = np.eye(len(x))
+
+    for _ in range(max_iter):
+        if np.max(np.abs(residual[active]), initial=0.0) < tol:
+            return x, True
+
+        jac = link_jacobian(x, xy, free_idx, link_pairs, link_lens)
+        try:
+            step = np.linalg.solve(jac.T @ jac + damping * identity, -(jac.T @ residual))
+        except np.linalg.LinAlgError:
+            return x, False
+
+        x_new = x + step
+        residual_new = link_residual(x_new, xy, free_idx, link_pairs, link_lens)
+        cost_new = residual_new @ residual_new
+        if cost_new < cost:
+            # Schritt annehmen, Dämpfung verringern (Richtung Gauß-Newton)
+            x, residual, cost = x_new, residual_new, cost_new
+            damping = max(damping * 0.1, 1e-12)
+        else:
+            # Schritt verwerfen, Dämpfung erhöhen (Richtung Gradientenverfahren)
+            damping *= 10.0
+
+    return x, bool(np.max(np.abs(residual[active]), initial=0.0) < tol)
+
 # =================================================================================================
 # Mechanism Klasse (Kinematik und Datenbank-Methoden)
 # =================================================================================================
@@ -144,33 +248,40 @@ class Mechanism:
 
         # Berechnung der Soll-Längen der Links
         self.calculate_lengths()
+        # konstante Topologie (Index-Arrays) einmalig ableiten
+        self._build_topology()
 
     def __repr__(self):
         return f"Mechanismus: {self.name}, ID: {self.id}, Version: {self.version}"
     
     def __eq__(self, other):
         # Vergleich von Mechanismus-Objekten (zwei Mechanismen sind gleich, wenn alle Attribute gleich sind)
+        # Gelenktypen und Links werden exakt verglichen, Koordinaten, Drehpunkt, Radius und Link-Längen mit
+        # np.allclose (rtol=GEOMETRY_RTOL, atol=GEOMETRY_ATOL, je 1e-9), d.h. Abweichungen im Bereich der
+        # Rundungsfehler gelten als gleich
         if not isinstance(other, Mechanism):
             return False
-        # Vergleich Name
-        if self.name != other.name:
+        # günstigste Prüfungen zuerst: Name und Anzahl Gelenke/Links
+        if self.name != other.name or len(self.joints) != len(other.joints) or len(self.links) != len(other.links):
             return False
-        
-        # Vergleich Joints:
-        if len(self.joints) != len(other.joints):
-            return False
-        for i in range(len(self.joints)):
-            if self.joints[i] != other.joints[i]:
-                return False
-        
-        # Vergleich Links:
-        if len(self.links) != len(other.links):
-            return False
-        for i in range(len(self.links)):
-            if self.links[i] != other.links[i]:
-                return False
-        
-        return True
+
+        # Vergleich Joints und Links über Arrays, die aus den aktuellen Joint- und Link-Objekten gebildet werden
+        # (nicht die in _build_topology vorberechneten, damit nachträgliche Änderungen an Gelenken/Links zählen)
+        joints_a, pairs_a, lens_a, protected_a = self._geometry_arrays()
+        joints_b, pairs_b, lens_b, protected_b = other._geometry_arrays()
+
+        def close(a, b):
+            # Drehpunkt/Radius: NaN = nicht vorhanden, gilt als gleich
+            return np.allclose(a, b, rtol=GEOMETRY_RTOL, atol=GEOMETRY_ATOL, equal_nan=True)
+
+        return (
+            np.array_equal(joints_a["type"], joints_b["type"])
+            and np.array_equal(pairs_a, pairs_b)
+            and np.array_equal(protected_a, protected_b)
+            and all(close(joints_a[field], joints_b[field]) for field in ("x", "y", "cx", "cy", "r"))
+            and close(lens_a, lens_b)
+        )
+
     # ==============================
     # Kinematik-Methoden:
     # ==============================
@@ -178,11 +289,111 @@ class Mechanism:
         """
         Falls ein Link noch keine "length" hat, wird sie aus den Joint-Koordinaten abgeleitet.
         """
-        for link in self.links:
-            if link.length is None:
-                dx = link.end_joint.x - link.start_joint.x
-                dy = link.end_joint.y - link.start_joint.y
-                link.length = np.sqrt(dx**2 + dy**2)
+        missing = [link for link in self.links if link.length is None]
+        if not missing:
+            return
+
+        # alle fehlenden Längen in einem vektorisierten Ausdruck aus den Gelenk-Koordinaten berechnen
+        # (gleiche Formel wie bisher pro Link, np.hypot würde um 1 ulp abweichen und gespeicherte Längen verändern)
+        # (Index über die Objekt-ID wie in _geometry_arrays)
+        joint_id = {id(joint): i for i, joint in enumerate(self.joints)}
+        xs = np.fromiter((joint.x for joint in self.joints), dtype=np.float64, count=len(self.joints))
+        ys = np.fromiter((joint.y for joint in self.joints), dtype=np.float64, count=len(self.joints))
+        start_idx = np.fromiter((joint_id[id(link.start_joint)] for link in missing), dtype=np.intp, count=len(missing))
+        end_idx = np.fromiter((joint_id[id(link.end_joint)] for link in missing), dtype=np.intp, count=len(missing))
+        dx = xs[end_idx] - xs[start_idx]
+        dy = ys[end_idx] - ys[start_idx]
+        lengths = np.sqrt(dx**2 + dy**2)
+
+        for link, length in zip(missing, lengths.tolist()):
+            link.length = length
+
+    def _geometry_arrays(self):
+        """
+        Bildet die Geometrie aus den aktuellen Joint- und Link-Objekten als Arrays:
+        Gelenke als strukturiertes Array (siehe JOINT_DTYPE, fehlender Drehpunkt/Radius = NaN),
+        Links als (L, 2)-Array von Gelenk-Indizes [start, end], Soll-Längen und protected-Flags.
+        """
+        joint_array = np.array(
+            [(joint.x, joint.y, joint.type,
+              *(joint.center if joint.center else (np.nan, np.nan)),
+              joint.radius if joint.radius else np.nan) for joint in self.joints],
+            dtype=JOINT_DTYPE
+        )
+        # Index jedes Gelenks über die Objekt-ID (joints.index vergleicht jedes Gelenk per __eq__,
+        # ist O(n) und liefert bei zwei gleichen Gelenken, z.B. beide in (0, 0), immer das erste)
+        joint_id = {id(joint): i for i, joint in enumerate(self.joints)}
+        link_pairs = np.array(
+            [(joint_id[id(link.start_joint)], joint_id[id(link.end_joint)]) for link in self.links],
+            dtype=np.int32
+        ).reshape(-1, 2)
+        link_lens = np.fromiter((link.length for link in self.links), dtype=np.float64, count=len(self.links))
+        link_protected = np.fromiter((bool(link.protected) for link in self.links), dtype=bool, count=len(self.links))
+        return joint_array, link_pairs, link_lens, link_protected
+
+    def _build_topology(self):
+        """
+        Leitet die konstante Topologie des Mechanismus einmalig aus den Joint- und Link-Objekten ab
+        und speichert sie als Index-Arrays. kinematics() greift nur noch auf diese Arrays zu, statt
+        in jedem Frame Gelenktypen und Link-Indizes erneut zu ermitteln.
+        """
+        # Gelenke zusätzlich als strukturiertes Array (siehe JOINT_DTYPE), Links als Index-Paare [start, end]
+        # mit Soll-Längen und protected-Flags
+        self._joint_array, self._link_pairs, self._link_lens, self._link_protected = self._geometry_arrays()
+        # Koordinaten der Ausgangslage und Typen als parallele Arrays (Structure of Arrays, Sichten auf die Felder)
+        self._xs = self._joint_array["x"]
+        self._ys = self._joint_array["y"]
+        self._types = self._joint_array["type"]
+        # zusammenhängendes (n, 2)-Koordinaten-Array der Ausgangslage (wird nicht verändert)
+        self._xy = np.column_stack((self._xs, self._ys))
+
+        self._fixed_idx = np.flatnonzero(self._types == "Fixiert")
+        self._free_idx = np.flatnonzero(self._types == "Frei beweglich")
+
+        # Antrieb (Gelenk mit Kreisbahnbewegung): Index, Drehpunkt und Radius (-1/None, falls nicht vorhanden)
+        self._crank_idx = -1
+        self._center_xy = None
+        self._radius = None
+        for i, joint in enumerate(self.joints):
+            if joint.type == "Kreisbahnbewegung" and joint.center and joint.radius:
+                self._crank_idx = i
+                self._center_xy = np.array(joint.center, dtype=np.float64)
+                self._radius = float(joint.radius)
+                break
+
+        # Je Gelenk der Index des fixierten Gelenks im Drehpunkt (-1, falls kein Antrieb oder kein Gelenk im Drehpunkt)
+        self._center_idx = np.full(len(self.joints), -1, dtype=np.int32)
+        if self._crank_idx >= 0:
+            at_center = np.flatnonzero((self._types == "Fixiert")
+                                       & np.isclose(self._xs, self._center_xy[0])
+                                       & np.isclose(self._ys, self._center_xy[1]))
+            if at_center.size:
+                self._center_idx[self._crank_idx] = at_center[0]
+
+        # Zerlegung in Zweischläge für die geschlossene Lösung (None, falls nicht möglich)
+        self._dyads = self._find_dyads()
+
+    def geometry_hash(self) -> str:
+        """
+        Gibt einen Hash über die Geometrie des Mechanismus zurück (Gelenkkoordinaten, Gelenktypen,
+        Drehpunkt und Radius des Antriebs, Links und deren Längen). Mechanismen mit identischer
+        Geometrie haben unabhängig von Name, ID und Version denselben Hash und damit dieselbe Kinematik.
+        Die Gelenke gehen als Bytes des strukturierten Arrays (_joint_array, Ausgangslage) ein. Alle Gleitkomma-Werte
+        werden vorher auf GEOMETRY_HASH_DECIMALS Nachkommastellen gerundet, damit Rundungsunterschiede im letzten Bit
+        (z.B. unterschiedlich berechnete Längen) denselben Hash ergeben.
+        """
+        joints = self._joint_array.copy()
+        for field in ("x", "y", "cx", "cy", "r"):
+            # "+ 0.0" macht aus -0.0 (z.B. gerundete kleine negative Werte) 0.0, sonst wären die Bytes verschieden
+            joints[field] = np.round(joints[field], GEOMETRY_HASH_DECIMALS) + 0.0
+        link_lens = np.round(self._link_lens, GEOMETRY_HASH_DECIMALS) + 0.0
+
+        return hashlib.blake2b(
+            joints.tobytes()
+            + np.ascontiguousarray(self._link_pairs).tobytes()
+            + link_lens.tobytes(),
+            digest_size=16
+        ).hexdigest()
 
     def compute_theta_range(self, steps=100):
         """
@@ -191,145 +402,242 @@ class Mechanism:
         wird dessen aktueller Winkel (Startposition) als Startwinkel genommen, 
         sonst (kein Kreisgelenk) beginnt es bei 0.
         """ 
-        for joint in self.joints:
-            if joint.type == "Kreisbahnbewegung" and joint.center and joint.radius:
-                cx, cy = joint.center
-                dx = joint.x - cx
-                dy = joint.y - cy
-                start_angle = np.arctan2(dy, dx)
-                return np.linspace(start_angle, start_angle + 2 * np.pi, steps)
+        # Antrieb und Drehpunkt stammen aus der einmalig aufgebauten Topologie (_build_topology)
+        if self._crank_idx >= 0:
+            k = self._crank_idx
+            c = self._center_idx[k]
+            center_x, center_y = (self._xs[c], self._ys[c]) if c >= 0 else self._center_xy
+            start_angle = np.arctan2(self._ys[k] - center_y, self._xs[k] - center_x)
+            return np.linspace(start_angle, start_angle + 2 * np.pi, steps)
         
         # Kein Kreisgelenk gefunden -> Startwinkel = 0° (Fallback)
         return np.linspace(0, 2 * np.pi, steps)
 
-    def error_function(self, positions: list):
+    def _least_squares_method(self):
         """
-        Fehlerfunktion für least_squares:
-        positions: [x1, y1, x2, y2, ...] aller Frei beweglichen Gelenke.
-        Vergleicht die aktuellen Längen der Links mit den Soll-Längen.
+        Optimierungsmethode für least_squares: Das Problem hat keine Schranken, daher 'lm' (Levenberg-Marquardt, MINPACK)
+        statt des für Schranken gedachten 'dogbox'. 'lm' benötigt mindestens so viele Fehlerterme (Links)
+        wie Unbekannte (Koordinaten der freien Gelenke), sonst wird 'trf' verwendet.
         """
-        # Erstellung einer Kopie der Gelenkpositionen
-        temp_positions = {}
-        
-        # Aktualisieren der Positionen der frei beweglichen Gelenke
-        index = 0
-        for i, joint in enumerate(self.joints):
-            if joint.type == "Frei beweglich":
-                # Updaten mit den Optimierungswerten
-                temp_positions[i] = {"x": positions[index], "y": positions[index + 1]}
-                index += 2
+        return 'lm' if len(self._link_pairs) >= 2 * len(self._free_idx) else 'trf'
+
+    def _find_dyads(self):
+        """
+        Zerlegt den Mechanismus in Zweischläge: Ausgehend von den fixierten Gelenken und dem Antrieb
+        wird wiederholt ein frei bewegliches Gelenk gesucht, das über zwei Links mit bereits bekannten
+        Gelenken verbunden ist. Seine Position ist dann der Schnittpunkt zweier Kreise.
+        Zweischläge, deren Ankergelenke bereits vorher bekannt sind, hängen nicht voneinander ab und werden
+        zu einer Stufe zusammengefasst. Gibt eine Liste von Stufen zurück, jede Stufe als Tupel von Arrays
+        (frei, anker_a, anker_b, länge_a, länge_b, vorzeichen), oder None, falls sich der Mechanismus
+        nicht vollständig so zerlegen lässt.
+        """
+        n_joints = len(self.joints)
+        neighbours = [[] for _ in range(n_joints)]
+        for k, (i, j) in enumerate(self._link_pairs):
+            neighbours[i].append((j, k))
+            neighbours[j].append((i, k))
+
+        known = np.zeros(n_joints, dtype=bool)
+        known[self._fixed_idx] = True
+        if self._crank_idx >= 0:
+            known[self._crank_idx] = True
+        # Stufe eines Gelenks: 0 für fixierte Gelenke und Antrieb, sonst 1 + höchste Stufe der Anker
+        level = np.zeros(n_joints, dtype=int)
+
+        dyads = []
+        used_links = set()
+        open_joints = [int(f) for f in self._free_idx]
+        while open_joints:
+            for f in open_joints:
+                anchors = [(j, k) for (j, k) in neighbours[f] if known[j]]
+                if len(anchors) >= 2:
+                    break
             else:
-                # den aktuellen Wert beibehalten für Gelenke mit Kreisbahnbewegung und fixierten Gelenken
-                temp_positions[i] = {"x": joint.x, "y": joint.y}
-        
-        # Berechnung der aktuellen Längen der Links basierend auf den temp_positions
-        current_lengths = []
-        for link in self.links:
-            index_start = self.joints.index(link.start_joint)
-            index_end = self.joints.index(link.end_joint)
-            dx = temp_positions[index_end]["x"] - temp_positions[index_start]["x"]
-            dy = temp_positions[index_end]["y"] - temp_positions[index_start]["y"]
-            current_lengths.append(np.sqrt(dx**2 + dy**2))
-
-        # Soll-Längen aus Link-Objekten extrahieren
-        target_lengths = [link.length for link in self.links]
-
-        # Fehler berechnen
-        error = np.array(current_lengths) - np.array(target_lengths)
-        return error 
-
-    def optimization_function(self):
-        """
-        Ruft least_squares auf, um die Positionen der freien Gelenke
-        an die Soll-Längen anzupassen.
-        """
-        # Startwerte für die frei beweglichen Gelenke
-        free_joints = [joint for joint in self.joints if joint.type == "Frei beweglich"]
-        positions = []
-        for joint in free_joints:
-            positions.append(joint.x)
-            positions.append(joint.y)
-
-        initial_positions = np.array(positions, dtype=float)
-
-        result = least_squares(
-            self.error_function, # Fehlerfunktion
-            initial_positions,   # Startpositionen
-            method='dogbox'      # Optimierungsmethode
-        )
+                return None # kein weiteres Gelenk über Zweischlag bestimmbar
+
+            (a, k_a), (b, k_b) = anchors[0], anchors[1]
+            # Vorzeichen (Lage links/rechts der Strecke a-b) aus der Startkonfiguration übernehmen
+            ja, jb, jf = self.joints[a], self.joints[b], self.joints[f]
+            cross = (jb.x - ja.x) * (jf.y - ja.y) - (jb.y - ja.y) * (jf.x - ja.x)
+            sign = 1.0 if cross >= 0 else -1.0
+            dyads.append((f, a, b, self._link_lens[k_a], self._link_lens[k_b], sign))
+            used_links.update((k_a, k_b))
+            known[f] = True
+            level[f] = 1 + max(level[a], level[b])
+            open_joints.remove(f)
+
+        # jeder Link an einem frei beweglichen Gelenk muss genau einmal verwendet worden sein,
+        # sonst gibt es zusätzliche Bedingungen, die die geschlossene Lösung nicht berücksichtigt
+        free = np.zeros(n_joints, dtype=bool)
+        free[self._free_idx] = True
+        links_at_free = {k for k, (i, j) in enumerate(self._link_pairs) if free[i] or free[j]}
+        if used_links != links_at_free:
+            return None
+
+        # unabhängige Zweischläge je Stufe zu Arrays zusammenfassen
+        levels = []
+        for current in sorted({level[f] for f, *_ in dyads}):
+            group = [dyad for dyad in dyads if level[dyad[0]] == current]
+            f, a, b, la, lb, sign = (np.array(column) for column in zip(*group))
+            levels.append((f, a, b, la.astype(np.float64), lb.astype(np.float64), sign))
+
+        return levels
 
-        # Positionen der beweglichen Gelenke nach dem Optimieren aktualisieren
-        # result ist OptimizeResult-Objekt mit Attribut 'x' (Koordinaten der Gelenke)
-        index = 0
-        for joint in free_joints:
-            joint.x = result.x[index]
-            joint.y = result.x[index + 1]
-            index += 2
+    def _solve_dyads(self, theta_range):
+        """
+        Berechnet die Gelenkpositionen für alle Winkel in theta_range gleichzeitig (ohne Verzweigungen):
+        Für alle Zweischläge einer Stufe wird der Kreisschnittpunkt als ein Array über alle Frames berechnet.
+        Nicht montierbare Stellungen (Kreise schneiden sich nicht) ergeben np.nan.
+        Rückgabe: Array der Form (Frames, Gelenke, 2) in float64.
+        """
+        theta_range = np.asarray(theta_range, dtype=np.float64)
+        xy = np.empty((len(theta_range), len(self.joints), 2), dtype=np.float64)
+        xy[:] = self._xy  # Ausgangslage (vorberechnet in _build_topology) in alle Frames übernehmen
+        if self._crank_idx >= 0:
+            xy[:, self._crank_idx, 0] = self._center_xy[0] + self._radius * np.cos(theta_range)
+            xy[:, self._crank_idx, 1] = self._center_xy[1] + self._radius * np.sin(theta_range)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # je Stufe Arrays der Form (Frames, Zweischläge der Stufe)
+            for f, a, b, la, lb, sign in self._dyads:
+                dx = xy[:, b, 0] - xy[:, a, 0]
+                dy = xy[:, b, 1] - xy[:, a, 1]
+                d2 = dx * dx + dy * dy
+                d = np.sqrt(d2)
+                # Abstand des Lotfußpunkts von a und halbe Sehnenlänge h (h² < 0 -> kein Schnittpunkt)
+                a_ = (la * la - lb * lb + d2) / (2 * d)
+                h2 = la * la - a_ * a_
+                h = np.where(h2 < 0, np.nan, np.sqrt(np.maximum(h2, 0)))
+                xy[:, f, 0] = xy[:, a, 0] + (a_ * dx - sign * h * dy) / d
+                xy[:, f, 1] = xy[:, a, 1] + (a_ * dy + sign * h * dx) / d
+
+        return xy
+
+    def _least_squares_kinematics(self, theta_range):
+        """
+        Simulation Frame für Frame mit least_squares (für Mechanismen, die sich nicht in Zweischläge zerlegen lassen).
+        Gibt (trajectories, fail_count) zurück.
+        """
+        fail_count = 0  # Zähler für fehlgeschlagene Optimierungen
+
+        # Gelenkpositionen der Ausgangslage als Array (Kopie, die Joint-Objekte werden nicht verändert)
+        xy = self._xy.copy()
+        trajectories = np.empty((len(theta_range), len(xy), 2), dtype=np.float64)
+        free_idx = self._free_idx
+        args = (xy, free_idx, self._link_pairs, self._link_lens)
+
+        # Startwert: Ausgangslage, danach jeweils die Lösung des vorherigen Winkels (Warmstart),
+        # da sich der Mechanismus zwischen zwei Winkeln nur wenig bewegt
+        x0 = xy[free_idx].ravel()
+        method = self._least_squares_method()
+        x_prev = None  # Lösung des vorletzten Frames (für die Tangenten-Vorhersage, None nach Fehlschlag)
+        # Vorhersage nur bei gleichmäßigen Winkelschritten (nicht für die Einzel-Frames aus kinematics())
+        theta_steps = np.diff(theta_range)
+        uniform_steps = theta_steps.size > 0 and np.allclose(theta_steps, theta_steps[0])
+
+        # Positionen des Kreisbahngelenks für alle Winkel auf einmal (vektorisiertes cos/sin statt je Frame)
+        if self._crank_idx >= 0:
+            theta_range = np.asarray(theta_range, dtype=np.float64)
+            crank_xy = self._center_xy + self._radius * np.column_stack((np.cos(theta_range), np.sin(theta_range)))
+
+        for frame in range(len(theta_range)):
+            # Kreisbahngelenk setzen (Antrieb aus der vorberechneten Topologie, siehe _build_topology())
+            if self._crank_idx >= 0:
+                xy[self._crank_idx] = crank_xy[frame]
+
+            # Vorhersage entlang der Tangente der Bahn (Differenz der beiden letzten Lösungen, gleichmäßige Winkelschritte),
+            # der Löser muss dann nur noch den Fehler zweiter Ordnung korrigieren
+            x_guess = 2.0 * x0 - x_prev if uniform_steps and x_prev is not None else x0
+
+            # Optimierung: zuerst der schlanke Levenberg-Marquardt-Löser (_solve_frame),
+            # nur wenn dieser nicht konvergiert wie bisher least_squares (ab der letzten Lösung)
+            x, converged = _solve_frame(x_guess, *args)
+            if not converged:
+                result = least_squares(link_residual, x0, jac=link_jacobian, method=method, args=args)
+                if not result.success:
+                    fail_count += 1
+                x = result.x
+            x_prev = x0 if converged else None
+            x0 = x
 
-        return result # für Auswertung von result.succes in kinematics()-Methode
+            # aktuelle Gelenkposition speichern
+            xy[free_idx] = np.reshape(x, (-1, 2))
+            trajectories[frame] = xy
+
+        return trajectories, fail_count
 
     def kinematics(self, theta_range):
         """
         Führt eine Simulation für alle Winkel in theta_range durch.
-        Setzt Kreisbahn-Gelenke, ruft optimization_function() auf
-        und speichert die Positionen in 'trajectories'.
+        Lässt sich der Mechanismus in Zweischläge zerlegen, werden alle Frames geschlossen berechnet
+        (_solve_dyads()), sonst wird je Frame least_squares aufgerufen (_least_squares_kinematics()).
+        'trajectories' wird als float32-Array der Form (Frames, Gelenke, 2) zurückgegeben,
+        da die Koordinaten nur zur Darstellung bzw. für den Export verwendet werden.
         """
         # Für ebenen Mechanismus mit den Voraussetzungen bzw. Randbedingungen lt. Aufgabenstellung, sind mindestens 4 Gelenke erforderlich
         if len(self.joints) < 4:
             raise ValueError("Mechanismus unvollständig. Mindestens 4 Gelenke erforderlich.")
 
-        trajectories = []
-        fail_count = 0  # Zähler für fehlgeschlagene Optimierungen
-
-        for theta in theta_range:
-            # Kreisbahngelenke setzen
-            for joint in self.joints:
-                if joint.type == "Kreisbahnbewegung" and joint.center and joint.radius:
-                    cx, cy = joint.center
-                    r = joint.radius
-                    joint.x = cx + r * np.cos(theta)
-                    joint.y = cy + r * np.sin(theta)
-            
-            # Optimierung
-            result = self.optimization_function()
-            if not result.success:
-                fail_count += 1
-
-            # aktuelle Gelenkposition speichern
-            current_positions = [(joint.x, joint.y) for joint in self.joints]
-            trajectories.append(current_positions)
+        if self._dyads is not None:
+            trajectories = self._solve_dyads(theta_range)
+            failed = np.isnan(trajectories).any(axis=(1, 2))
+            fail_count = int(np.count_nonzero(failed))
+            if fail_count > 0:
+                # nicht montierbare Stellungen wie bisher mit least_squares annähern (nur für die Darstellung)
+                approximated, _ = self._least_squares_kinematics(np.asarray(theta_range)[failed])
+                trajectories[failed] = approximated
+        else:
+            trajectories, fail_count = self._least_squares_kinematics(theta_range)
 
         # ggf. Warnung ausgeben (für wie viele Frames die Optimierung fehlgeschlagen ist)
         if fail_count > 0:
             print(f"Warnung: Bei {fail_count} von {len(theta_range)} Frames war die Optimierung nicht erfolgreich.")
 
+        trajectories = np.asarray(trajectories, dtype=np.float32)
+
         return trajectories, fail_count if fail_count > 0 else None
 
+    def kinematics_to_csv(self, theta_range, trajectories) -> bytes:
+        """
+        Gibt Winkel + Gelenkpositionen als CSV-Inhalt (Bytes) zurück, ohne eine Datei zu schreiben
+        (z.B. direkt für st.download_button).
+        Die Werte werden mit 6 signifikanten Stellen geschrieben (entspricht etwa der float32-Genauigkeit).
+        """
+        # Header
+        header = ["Theta (rad) | "] 
+        for i in range(len(self.joints)):  
+            header.append(f"Gelenk_{i+1}_x | ") 
+            header.append(f"Gelenk_{i+1}_y | ")  
+
+        # Daten: Winkel + (Frames, Gelenke, 2)-Array flach als x1, y1, x2, y2, ... in einer Tabelle,
+        # np.savetxt formatiert alle Zeilen auf einmal (Zeilenende wie bisher beim csv-Modul "\r\n")
+        table = np.column_stack((np.asarray(theta_range, dtype=np.float64),
+                                 np.asarray(trajectories, dtype=np.float64).reshape(len(theta_range), -1)))
+        buffer = io.StringIO()
+        np.savetxt(buffer, table, fmt="%.6g", delimiter=",", newline="\r\n", header=",".join(header), comments="")
+        return buffer.getvalue().encode("utf-8")
+
     def save_kinematics_to_csv(self, theta_range, trajectories, filename="coords_results.csv"):
         """
-        Exportiert Winkel + Gelenkpositionen in eine CSV-Datei.
-        """
-        with open(filename, mode="w", newline="") as file:
-            writer = csv.writer(file) 
-            # Header
-            header = ["Theta (rad) | "] 
-            for i in range(len(self.joints)):  
-                header.append(f"Gelenk_{i+1}_x | ") 
-                header.append(f"Gelenk_{i+1}_y | ")  
-            writer.writerow(header) 
-            
-            # Daten
-            for i, theta in enumerate(theta_range):  
-                row = [theta] 
-                for (x, y) in trajectories[i]: 
-                    row.append(x)  
-                    row.append(y)  
-                writer.writerow(row)    
+        Exportiert Winkel + Gelenkpositionen in eine CSV-Datei (Inhalt aus kinematics_to_csv()).
+        """
+        with open(filename, mode="wb") as file:
+            file.write(self.kinematics_to_csv(theta_range, trajectories))
         return filename 
 
     # ==============================
     # Speichern und Laden von Mechanismus-Konfigurationen:
     # ==============================
+    @classmethod
+    def _db(cls) -> DatabaseConnector:
+        """
+        Gemeinsame Datenbankverbindung aller Datenbank-Methoden (DatabaseConnector ist ein Singleton).
+        Die TinyDB-Instanz bleibt zwischen den Aufrufen geöffnet, statt für jede Abfrage neu geöffnet
+        und wieder geschlossen zu werden. Vor dem Kopieren/Überschreiben der Datei (Backup/Import)
+        schließt main.py die Verbindung explizit, sie wird beim nächsten Zugriff neu geöffnet.
+        """
+        return DatabaseConnector()
+
     def save_mechanism(self):
         """
         Speichert diesen Mechanismus in der 'mechanism_configurations'-Tabelle.
@@ -337,8 +645,8 @@ class Mechanism:
         - Wenn bereits eine ID existiert, version += 1, da wir davon ausgehen, 
           dass sich der Mechanismus geändert hat.
         """
-        # Datenbankverbindung herstellen
-        db_conn = DatabaseConnector()
+        # Datenbankverbindung (bleibt geöffnet, siehe _db())
+        db_conn = self._db()
         mechanism_table = db_conn.get_table('mechanism_configurations')
 
         if not self.id:
@@ -355,28 +663,16 @@ class Mechanism:
         Die Verwendung von self.__dict__ zur Speicherung ist hier nicht möglich, 
         da wir verschachtelte Objekte (Joint-Objekte in Link-Objekten) haben.
         """
-        joints_list = []
-        for joint in self.joints:
-            entry = {
-                "x": joint.x,
-                "y": joint.y,
-                "type": joint.type,
-                "center": joint.center,
-                "radius": joint.radius
-            }
-            joints_list.append(entry)
-
-        links_list = []
-        for link in self.links:
-            start_index = self.joints.index(link.start_joint)
-            end_index = self.joints.index(link.end_joint)
-            entry = {
-                "start": start_index,
-                "end": end_index,
-                "length": link.length,
-                "protected": link.protected
-            }
-            links_list.append(entry)
+        joints_list = [
+            {"x": joint.x, "y": joint.y, "type": joint.type, "center": joint.center, "radius": joint.radius}
+            for joint in self.joints
+        ]
+
+        # Gelenk-Indizes der Links stammen aus den vorberechneten Index-Paaren (_build_topology)
+        links_list = [
+            {"start": start_index, "end": end_index, "length": link.length, "protected": link.protected}
+            for link, (start_index, end_index) in zip(self.links, self._link_pairs.tolist())
+        ]
         
         data = {
             "id": self.id,
@@ -385,15 +681,9 @@ class Mechanism:
             "joints": joints_list,
             "links": links_list
         }
+        # Einfügen oder Aktualisieren in einem Schritt (statt get + update/insert)
         mechanism_query = Query()
-        existing = mechanism_table.get(mechanism_query.id == self.id)
-        if existing:
-            mechanism_table.update(data, mechanism_query.id == self.id)
-        else:
-            mechanism_table.insert(data)
-
-        # Datenbankverbindung schließen
-        db_conn.close()
+        mechanism_table.upsert(data, mechanism_query.id == self.id)
 
     @classmethod
     def load_mechanism(cls, mechanism_id: str):
@@ -401,7 +691,7 @@ class Mechanism:
         Lädt einen Mechanismus anhand seiner 'id'.
         Gibt ein Mechanism-Objekt zurück oder None, wenn nicht gefunden.
         """
-        db_conn = DatabaseConnector()
+        db_conn = cls._db()
         mechanism_table = db_conn.get_table('mechanism_configurations')
 
         mechanism_query = Query()
@@ -442,8 +732,6 @@ class Mechanism:
             mechanism_id=found["id"],
             version=found["version"]
         )
-
-        db_conn.close()
         
         return mechanism
 
@@ -454,7 +742,7 @@ class Mechanism:
         In UI kann dann beispielsweise nur der Name angezeit werden.
         Mechanismus-Objekt wird erst beim Laden der Konfiguration erstellt.
         """
-        db_conn = DatabaseConnector()
+        db_conn = cls._db()
         mechanism_table = db_conn.get_table('mechanism_configurations')
 
         results = []
@@ -465,8 +753,6 @@ class Mechanism:
                 "version": entry.get("version", 1)
             })
 
-        db_conn.close()
-
         return results
 
     @classmethod
@@ -474,15 +760,14 @@ class Mechanism:
         """
         Löscht den Mechanismus und den dazugehörigen Kinematik-Eintrag (falls vorhanden) anhand der ID.
         """
-        db_conn = DatabaseConnector()
+        db_conn = cls._db()
         mechanism_table = db_conn.get_table('mechanism_configurations')
         kinematics_table = db_conn.get_table('mechanism_kinematics')
 
         mechanism_query = Query()
         mechanism_table.remove(mechanism_query.id == mechanism_id)
         kinematics_table.remove(mechanism_query.mechanism_id == mechanism_id)
-
-        db_conn.close()
+        cls.clear_kinematics_cache()
 
     # ==============================
     # Speichern und Laden von Mechanismus-Kinematik:
@@ -492,44 +777,77 @@ class Mechanism:
         Speichert Kinematik-Daten in 'mechanism_kinematics'.
         - self.id muss existieren (Mechanismus muss gespeichert sein)
         - self.version = Mechanismus-Version
-        - Überschreibt ggf. den alten Eintrag für diesen Mechanismus
+        - Pro Mechanismus wird ein Eintrag je Schrittweite (steps) gespeichert,
+          ein alter Eintrag mit gleicher Schrittweite wird überschrieben
         """
-        db_conn = DatabaseConnector()
+        db_conn = self._db()
         kinematics_table = db_conn.get_table('mechanism_kinematics')
 
         # Prüfen, ob Mechanismus gespeichert ist
         if not self.id:
             raise ValueError("Mechanismus hat keine ID. Bitte speichern Sie den Mechanismus zuerst (Aufruf von save_mechanism()).")
+
+        trajectories = np.ascontiguousarray(trajectories, dtype=np.float32)
         
         kinematic_query = Query()
-        # Alten Eintrag löschen (falls vorhanden) - ein Mechanismus hat genau einen Kinematik-Eintrag
-        kinematics_table.remove(kinematic_query.mechanism_id == self.id)
+        # Alten Eintrag mit gleicher Schrittweite sowie Einträge veralteter Versionen löschen (falls vorhanden)
+        kinematics_table.remove(
+            (kinematic_query.mechanism_id == self.id)
+            & ((kinematic_query.steps == steps) | (kinematic_query.mechanism_version != self.version))
+        )
 
         data = {
             "mechanism_id": self.id,
             "mechanism_name": self.name,
             "mechanism_version": self.version,
+            "geom_hash": self.geometry_hash(),
             "steps": steps,
-            "theta_values": list(theta_range),
-            "trajectories": [[(x, y) for (x, y) in frame] for frame in trajectories]
+            "theta_values": np.asarray(theta_range, dtype=np.float64).tolist(),  # ein C-Aufruf, reine Python-floats
+            # Trajektorien als ein base64-kodierter float32-Block statt verschachtelter JSON-Listen
+            # (kleinere Datei, kein Parsen jeder einzelnen Zahl beim Laden), siehe _decode_trajectories()
+            "trajectories_blob": base64.b64encode(trajectories.tobytes()).decode("ascii"),
+            "shape": list(trajectories.shape),
+            "dtype": "float32"
         }
 
         kinematics_table.insert(data)
+        self.clear_kinematics_cache()
 
-        db_conn.close()
+    @staticmethod
+    def _decode_trajectories(entry: dict) -> np.ndarray:
+        """
+        Wandelt die gespeicherten Trajektorien eines Kinematik-Eintrags in ein float32-Array (Frames, Gelenke, 2) um.
+        Ältere Einträge (bzw. Datenbank-Backups) mit verschachtelten Listen unter "trajectories" werden weiterhin gelesen.
+        """
+        if "trajectories_blob" in entry:
+            data = base64.b64decode(entry["trajectories_blob"])
+            return np.frombuffer(data, dtype=entry.get("dtype", "float32")).reshape(entry["shape"])
+        return np.asarray(entry["trajectories"], dtype=np.float32)
 
     @classmethod
     def load_kinematics(cls, mechanism_id: str, mechanism_version: int, steps: int):
         """
         Lädt Kinematik-Daten (theta_values, trajectories) aus 'mechanism_kinematics'.
-        Falls die Version nicht übereinstimmt, ist die Kinematik veraltet.
-        Gibt (theta_values, trajectories) zurück oder (None, None).
+        Falls Version oder Schrittweite nicht übereinstimmen, ist die Kinematik veraltet.
+        steps = None lädt den zuletzt gespeicherten Eintrag (beliebige Schrittweite).
+        Die dekodierten Arrays werden im Speicher gehalten (_load_kinematics_cached), wiederholte Aufrufe
+        mit gleicher ID, Version und Schrittweite lesen die Datenbank nicht erneut.
+        Gibt (theta_values, trajectories als float32-Array) zurück oder (None, None).
         """
-        db_conn = DatabaseConnector()
+        return cls._load_kinematics_cached(mechanism_id, mechanism_version, steps)
+
+    @classmethod
+    @functools.lru_cache(maxsize=4)
+    def _load_kinematics_cached(cls, mechanism_id: str, mechanism_version: int, steps: int):
+        db_conn = cls._db()
         kinematics_table = db_conn.get_table('mechanism_kinematics')
 
         kinematic_query = Query()
-        found = kinematics_table.get(kinematic_query.mechanism_id == mechanism_id)
+        if steps is None:
+            entries = kinematics_table.search(kinematic_query.mechanism_id == mechanism_id)
+            found = entries[-1] if entries else None
+        else:
+            found = kinematics_table.get((kinematic_query.mechanism_id == mechanism_id) & (kinematic_query.steps == steps))
         if not found:
             return None, None
         
@@ -537,26 +855,55 @@ class Mechanism:
         if steps == None:
             steps = found["steps"]
 
-        if found["mechanism_version"] != mechanism_version and found["steps"] != steps:
+        if found["mechanism_version"] != mechanism_version or found["steps"] != steps:
             # Mechanismus wurde seitdem geändert -> Kinematik ist veraltet
             return None, None
-        
-        db_conn.close()
 
-        return found["theta_values"], found["trajectories"]
+        # Arrays schreibgeschützt, da sie im Cache von allen Aufrufern geteilt werden
+        theta_values = np.array(found["theta_values"], dtype=np.float64)
+        trajectories = np.array(cls._decode_trajectories(found))
+        theta_values.flags.writeable = False
+        trajectories.flags.writeable = False
+        return theta_values, trajectories
+
+    @classmethod
+    def clear_kinematics_cache(cls):
+        """
+        Leert den Cache von load_kinematics() (nach Speichern oder Löschen von Kinematik bzw. Import der Datenbank).
+        """
+        cls._load_kinematics_cached.cache_clear()
+
+    @classmethod
+    def load_kinematics_by_geometry(cls, geom_hash: str, steps: int):
+        """
+        Lädt Kinematik-Daten anhand des Geometrie-Hashs (siehe geometry_hash()) und der Schrittweite.
+        Trifft auch Einträge anderer Mechanismen bzw. Versionen mit identischer Geometrie.
+        Gibt (theta_values als float64-Array, trajectories als float32-Array) zurück oder (None, None),
+        beide Arrays sind beschreibbare Kopien (nicht gecacht).
+        """
+        db_conn = cls._db()
+        kinematics_table = db_conn.get_table('mechanism_kinematics')
+
+        kinematic_query = Query()
+        found = kinematics_table.get((kinematic_query.geom_hash == geom_hash) & (kinematic_query.steps == steps))
+
+        if not found:
+            return None, None
+
+        # np.array kopiert, die frombuffer-Sicht aus _decode_trajectories ist schreibgeschützt
+        return np.array(found["theta_values"], dtype=np.float64), np.array(cls._decode_trajectories(found))
 
     @classmethod
     def delete_kinematics(cls, mechanism_id: str):
         """
         Löscht Kinematik-Eintrag für einen Mechanismus.
         """
-        db_conn = DatabaseConnector()
+        db_conn = cls._db()
         kinematics_table = db_conn.get_table('mechanism_kinematics')
 
         kinematic_query = Query()
         kinematics_table.remove(kinematic_query.mechanism_id == mechanism_id)
-
-        db_conn.close()
+        cls.clear_kinematics_cache()
 
 # =================================================================================================
 # Modul-Tests:
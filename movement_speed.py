@@ -2,7 +2,6 @@
 
 import numpy as np
 from mechanism import Mechanism
-import matplotlib.pyplot as plt
 
 # =============================================================
 # Berechnung der max. Vorwärtsbewegung des Strandbeestbeins
@@ -26,20 +25,24 @@ class StrandbeestSpeed:
         # omega in rad/s berechnen
         self.omega = (2 * np.pi * revolutions_per_minute) / 60
 
-        if not self.trajectories:
+        if self.trajectories is None or len(self.trajectories) == 0:
             raise ValueError("Keine Kinematik Daten vorhanden.")
         
-        # x und y Koordinaten aus der trajektion extrahieren
-        self.x_values = np.array([frame[joint_index][0] for frame in self.trajectories])
-        self.y_values = np.array([frame[joint_index][1] for frame in self.trajectories])
+        # x und y Koordinaten aus der trajektion extrahieren: einmal als Array (frames, gelenke, 2) umwandeln und slicen
+        # (Trajektorien können als float32 vorliegen, gerechnet wird in float64)
+        traj = np.asarray(self.trajectories, dtype=np.float64)
+        self.x_values = np.ascontiguousarray(traj[:, joint_index, 0])
+        self.y_values = np.ascontiguousarray(traj[:, joint_index, 1])
+
+    def _ground_contact_mask(self):
+        """ Boolesche Maske der Frames mit Bodenkontakt des Gelenks (y_min + Toleranz). """
+        # Minimale y-Hoehe ermitteln und Toleranz (Bodenkontakt) addieren
+        ground_contact_level = self.y_values.min() + self.ground_contact_tolerance
+        return self.y_values <= ground_contact_level
 
     def get_ground_contact_indices(self):
         """ Indizes finden, wo Bodenkontakt des Gelenks vorhanden ist + Toleranz. """
-        # Minimale y-Hoehe ermitteln und Toleranz (Bodenkontakt) addieren
-        y_min = np.min(self.y_values)
-        ground_contact_level = y_min + self.ground_contact_tolerance
-        # Indizes finden mit Bodenkontakt
-        ground_contact_indices = np.where(self.y_values <= ground_contact_level)[0]
+        ground_contact_indices = np.flatnonzero(self._ground_contact_mask())
         
         if len(ground_contact_indices) == 0:
             raise ValueError("Kein Bodenkontakt erkannt.")
@@ -47,7 +50,7 @@ class StrandbeestSpeed:
         return ground_contact_indices
 
     def calculate_stride_length(self, ground_contact_indices):
-        """ Schrittlänge vom Strandbeestbein berechnen """
+        """ Schrittlänge vom Strandbeestbein berechnen (ground_contact_indices: Indizes oder boolesche Maske) """
         # x Koordinaten während des Bodenkontakts
         x_ground_contact = self.x_values[ground_contact_indices]
         # Schrittweite berechnen
@@ -61,25 +64,23 @@ class StrandbeestSpeed:
         return stride_length, x_min, x_max
 
     def calculate_time_steps(self, ground_contact_indices, x_min, x_max):
-        """ Anzahl der Zeitframes (N) zwischen x_min und x_max berechnen"""
-        # Zeitindizes zwischen x_min und x_max finden
-        valid_indices = []
-        for idx in ground_contact_indices:
-            if x_min <= self.x_values[idx] <= x_max:
-                valid_indices.append(idx)
-        N = len(valid_indices) 
+        """ Anzahl der Zeitframes (N) zwischen x_min und x_max berechnen (ground_contact_indices: Indizes oder boolesche Maske) """
+        # Zeitindizes zwischen x_min und x_max zählen (Maske statt Schleife über die Indizes)
+        x_ground_contact = self.x_values[ground_contact_indices]
+        N = int(np.count_nonzero((x_ground_contact >= x_min) & (x_ground_contact <= x_max)))
         
         return N
 
     def calculate_max_speed(self):
         """ Berechnung der max Vorwärtsgeschwindigkeit eines bestimmten Gelenks """
-        ground_contact_indices = self.get_ground_contact_indices()
+        # Maske einmal bilden, die x-Werte des Bodenkontakts werden nur einmal gesammelt
+        ground_contact_mask = self._ground_contact_mask()
 
-        if len(ground_contact_indices) == 0:
+        if not ground_contact_mask.any():
             raise ValueError("Kein Bodenkontakt vorhanden.")
         
-        stride_length, x_min, x_max = self.calculate_stride_length(ground_contact_indices)
-        N = self.calculate_time_steps(ground_contact_indices, x_min, x_max)
+        stride_length, x_min, x_max = self.calculate_stride_length(ground_contact_mask)
+        N = self.calculate_time_steps(ground_contact_mask, x_min, x_max)
 
         if N <= 0:
             raise ValueError("Keine Zeitschritte vorhanden.")
@@ -95,6 +96,8 @@ class StrandbeestSpeed:
 
     def plot_ground_contact(self):
         """ Visualisierung der Bewegung des Gelenks als einzelne Punkte. Und der betrachteten Trajektorie für die Vorwärtsbewegung """
+        import matplotlib.pyplot as plt # erst hier importieren (nur für die Visualisierung benötigt)
+
         ground_contact_indices = self.get_ground_contact_indices()
 
         fig, ax = plt.subplots(figsize=(8, 5))
@@ -119,6 +122,8 @@ class StrandbeestSpeed:
 # Test von der Bewegungsgeschwindigkeit
 # =========================================
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     mechanisms = Mechanism.find_all_mechanisms()
     strandbeest = [m for m in mechanisms if "Strandbeest" in m["name"]][0]
     if not strandbeest:
@@ -136,7 +141,7 @@ if __name__ == "__main__":
         else:
             # Kinematik aus DB laden
             theta_range, trajectories = Mechanism.load_kinematics(mechanism_id, mechanism.version, steps=None)
-            if not trajectories:
+            if trajectories is None:
                 print("Kinematik kann nicht geladen werden.")
             else:
                 try:
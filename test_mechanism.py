@@ -0,0 +1,260 @@
+# test_mechanism.py
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from scipy.optimize import least_squares
+from database import DatabaseConnector
+from mechanism import Mechanism, Joint, Link, link_residual, link_jacobian, _solve_frame
+
+# =================================================================================================
+# Testgeometrien (entsprechen den Beispielen Viergelenkgetriebe und Strandbeest in database.json)
+# =================================================================================================
+FOUR_BAR_JOINTS = [
+    (0.0, 0.0, "Fixiert", None, None),
+    (0.25, 0.0, "Kreisbahnbewegung", [0.0, 0.0], 0.25),
+    (2.0, 2.0, "Frei beweglich", None, None),
+    (2.0, 0.0, "Fixiert", None, None),
+]
+FOUR_BAR_LINKS = [(0, 1, True), (1, 2, False), (2, 3, False)]
+
+STRANDBEEST_JOINTS = [
+    (0.0, 0.0, "Fixiert", None, None),
+    (38.0, 7.81, "Fixiert", None, None),
+    (49.73, -1.55, "Kreisbahnbewegung", [38.0, 7.81], 15.006748481933052),
+    (18.2, 37.3, "Frei beweglich", None, None),
+    (-34.82, 19.9, "Frei beweglich", None, None),
+    (-30.5, -19.22, "Frei beweglich", None, None),
+    (-19.33, -84.03, "Frei beweglich", None, None),
+    (0.67, -39.3, "Frei beweglich", None, None),
+]
+STRANDBEEST_LINKS = [(1, 2, True), (2, 3, False), (3, 4, False), (4, 5, False), (5, 6, False), (6, 7, False),
+                     (2, 7, False), (5, 7, False), (0, 7, False), (0, 4, False), (0, 3, False)]
+
+def build_mechanism(name, joints_data, links_data, noise=0.0, seed=0):
+    """
+    Erstellt einen Mechanismus aus (x, y, typ, drehpunkt, radius)- und (start, ende, protected)-Tupeln.
+    noise = maximale zufällige Abweichung, die auf Koordinaten, Drehpunkt, Radius und Link-Längen addiert wird
+    """
+    rng = np.random.default_rng(seed)
+
+    def jitter(value):
+        return float(value + rng.uniform(-noise, noise)) if noise else value
+
+    joints = [Joint(x=jitter(x), y=jitter(y), joint_type=joint_type,
+                    center=[jitter(c) for c in center] if center else None,
+                    radius=jitter(radius) if radius else None)
+              for x, y, joint_type, center, radius in joints_data]
+    links = [Link(joints[start], joints[end], protected=protected) for start, end, protected in links_data]
+    mechanism = Mechanism(name=name, joints=joints, links=links)
+    if noise:
+        # Längen erst nach der Berechnung aus den (verrauschten) Koordinaten zusätzlich verrauschen
+        for link in links:
+            link.length = jitter(link.length)
+        mechanism._build_topology()
+    return mechanism
+
+# =================================================================================================
+# Geschlossene Lösung (Zweischläge) gegen least_squares
+# =================================================================================================
+class TestDyadKinematics(unittest.TestCase):
+    """ Die geschlossene Lösung über Zweischläge muss dieselben Stellungen liefern wie least_squares. """
+
+    TOLERANCE = 1e-6
+
+    def assert_dyads_match_least_squares(self, mechanism, reverse=False):
+        self.assertIsNotNone(mechanism._dyads, "Mechanismus lässt sich nicht in Zweischläge zerlegen")
+        theta_range = np.asarray(mechanism.compute_theta_range(steps=100))
+        if reverse:
+            theta_range = theta_range[::-1]
+
+        dyad_xy = mechanism._solve_dyads(theta_range)
+        least_squares_xy, fail_count = mechanism._least_squares_kinematics(theta_range)
+
+        self.assertEqual(fail_count, 0)
+        self.assertFalse(np.isnan(dyad_xy).any())
+        np.testing.assert_allclose(dyad_xy, least_squares_xy, rtol=0, atol=self.TOLERANCE)
+
+    def test_four_bar(self):
+        mechanism = build_mechanism("Viergelenkgetriebe", FOUR_BAR_JOINTS, FOUR_BAR_LINKS)
+        self.assert_dyads_match_least_squares(mechanism)
+
+    def test_four_bar_reversed(self):
+        mechanism = build_mechanism("Viergelenkgetriebe", FOUR_BAR_JOINTS, FOUR_BAR_LINKS)
+        self.assert_dyads_match_least_squares(mechanism, reverse=True)
+
+    def test_strandbeest(self):
+        mechanism = build_mechanism("Strandbeest", STRANDBEEST_JOINTS, STRANDBEEST_LINKS)
+        self.assert_dyads_match_least_squares(mechanism)
+
+    def test_strandbeest_reversed(self):
+        mechanism = build_mechanism("Strandbeest", STRANDBEEST_JOINTS, STRANDBEEST_LINKS)
+        self.assert_dyads_match_least_squares(mechanism, reverse=True)
+
+    def test_kinematics_uses_dyads(self):
+        mechanism = build_mechanism("Strandbeest", STRANDBEEST_JOINTS, STRANDBEEST_LINKS)
+        theta_range = mechanism.compute_theta_range(steps=50)
+        trajectories, fail_count = mechanism.kinematics(theta_range)
+
+        self.assertIsNone(fail_count)
+        self.assertEqual(trajectories.shape, (50, len(STRANDBEEST_JOINTS), 2))
+        self.assertEqual(trajectories.dtype, np.float32)
+        np.testing.assert_allclose(trajectories, mechanism._solve_dyads(theta_range), rtol=0, atol=1e-4)
+
+# =================================================================================================
+# Geometrie-Hash (Kinematik-Cache)
+# =================================================================================================
+class TestGeometryHash(unittest.TestCase):
+    """ Rundungsrauschen unter 1e-9 darf den Geometrie-Hash nicht ändern, echte Änderungen schon. """
+
+    GEOMETRIES = {
+        "Viergelenkgetriebe": (FOUR_BAR_JOINTS, FOUR_BAR_LINKS),
+        "Strandbeest": (STRANDBEEST_JOINTS, STRANDBEEST_LINKS),
+    }
+
+    def test_stable_under_noise(self):
+        for name, (joints_data, links_data) in self.GEOMETRIES.items():
+            reference = build_mechanism(name, joints_data, links_data).geometry_hash()
+            for seed in range(10):
+                with self.subTest(mechanism=name, seed=seed):
+                    noisy = build_mechanism(name, joints_data, links_data, noise=9e-10, seed=seed)
+                    self.assertEqual(noisy.geometry_hash(), reference)
+
+    def test_independent_of_name_and_id(self):
+        first = build_mechanism("A", FOUR_BAR_JOINTS, FOUR_BAR_LINKS)
+        second = build_mechanism("B", FOUR_BAR_JOINTS, FOUR_BAR_LINKS)
+        second.id, second.version = "andere-id", 3
+        self.assertEqual(first.geometry_hash(), second.geometry_hash())
+
+    def test_negative_zero(self):
+        joints_data = [(-0.0, -0.0, *FOUR_BAR_JOINTS[0][2:])] + FOUR_BAR_JOINTS[1:]
+        reference = build_mechanism("Viergelenkgetriebe", FOUR_BAR_JOINTS, FOUR_BAR_LINKS)
+        negative_zero = build_mechanism("Viergelenkgetriebe", joints_data, FOUR_BAR_LINKS)
+        self.assertEqual(negative_zero.geometry_hash(), reference.geometry_hash())
+
+    def test_changes_with_geometry(self):
+        reference = build_mechanism("Strandbeest", STRANDBEEST_JOINTS, STRANDBEEST_LINKS)
+        moved = build_mechanism("Strandbeest", STRANDBEEST_JOINTS, STRANDBEEST_LINKS)
+        moved.links[3].length += 1e-5
+        moved._build_topology()
+        self.assertNotEqual(moved.geometry_hash(), reference.geometry_hash())
+
+# =================================================================================================
+# Levenberg-Marquardt je Frame (_solve_frame) und analytische Jacobi-Matrix
+# =================================================================================================
+class TestSolveFrame(unittest.TestCase):
+    """ _solve_frame muss wie least_squares auf die Soll-Längen konvergieren. """
+
+    def setUp(self):
+        self.mechanism = build_mechanism("Strandbeest", STRANDBEEST_JOINTS, STRANDBEEST_LINKS)
+        self.xy = self.mechanism._xy.copy()
+        self.args = (self.xy, self.mechanism._free_idx, self.mechanism._link_pairs, self.mechanism._link_lens)
+        # Startwert: Ausgangslage, leicht verschoben
+        rng = np.random.default_rng(0)
+        self.x0 = self.xy[self.mechanism._free_idx].ravel() + rng.uniform(-0.5, 0.5, 2 * len(self.mechanism._free_idx))
+
+    def test_jacobian_matches_finite_differences(self):
+        jac = link_jacobian(self.x0, *self.args)
+        eps = 1e-6
+        numeric = np.empty_like(jac)
+        for col in range(len(self.x0)):
+            step = np.zeros_like(self.x0)
+            step[col] = eps
+            numeric[:, col] = (link_residual(self.x0 + step, *self.args) - link_residual(self.x0 - step, *self.args)) / (2 * eps)
+        np.testing.assert_allclose(jac, numeric, rtol=0, atol=1e-6)
+
+    def test_converges_like_least_squares(self):
+        x, converged = _solve_frame(self.x0, *self.args)
+        self.assertTrue(converged)
+        np.testing.assert_allclose(link_residual(x, *self.args), 0.0, atol=1e-8)
+
+        result = least_squares(link_residual, self.x0, jac=link_jacobian, method="lm", args=self.args)
+        np.testing.assert_allclose(x, result.x, rtol=0, atol=1e-6)
+
+# =================================================================================================
+# Speichern und Laden der Kinematik (base64-kodierter float32-Block)
+# =================================================================================================
+class TestKinematicsStorage(unittest.TestCase):
+    """ Speichern/Laden über eine temporäre Datenbank (database.json bleibt unverändert). """
+
+    STEPS = 40
+
+    def setUp(self):
+        self.connector = DatabaseConnector()
+        self.connector.close()
+        self.original_path = self.connector.path
+        self.temp_dir = tempfile.mkdtemp()
+        self.connector.path = os.path.join(self.temp_dir, "database.json")
+        Mechanism.clear_kinematics_cache()
+
+        self.mechanism = build_mechanism("Viergelenkgetriebe", FOUR_BAR_JOINTS, FOUR_BAR_LINKS)
+        self.mechanism.save_mechanism()
+        self.theta_range = self.mechanism.compute_theta_range(steps=self.STEPS)
+        self.trajectories, _ = self.mechanism.kinematics(self.theta_range)
+        self.mechanism.save_kinematics(self.theta_range, self.trajectories, self.STEPS)
+
+    def tearDown(self):
+        self.connector.close()
+        self.connector.path = self.original_path
+        Mechanism.clear_kinematics_cache()
+        shutil.rmtree(self.temp_dir)
+
+    def assert_not_found(self, result):
+        theta_values, trajectories = result
+        self.assertIsNone(theta_values)
+        self.assertIsNone(trajectories)
+
+    def test_round_trip(self):
+        theta_values, trajectories = Mechanism.load_kinematics(self.mechanism.id, self.mechanism.version, self.STEPS)
+
+        np.testing.assert_array_equal(theta_values, self.theta_range)
+        self.assertEqual(trajectories.dtype, np.float32)
+        np.testing.assert_array_equal(trajectories, self.trajectories)
+        # geteilte Cache-Einträge sind schreibgeschützt
+        self.assertFalse(trajectories.flags.writeable)
+
+    def test_round_trip_from_file(self):
+        # Verbindung schließen, damit tatsächlich aus der JSON-Datei gelesen wird
+        self.connector.close()
+        Mechanism.clear_kinematics_cache()
+        theta_values, trajectories = Mechanism.load_kinematics(self.mechanism.id, self.mechanism.version, steps=None)
+        np.testing.assert_array_equal(theta_values, self.theta_range)
+        np.testing.assert_array_equal(trajectories, self.trajectories)
+
+    def test_round_trip_by_geometry(self):
+        theta_values, trajectories = Mechanism.load_kinematics_by_geometry(self.mechanism.geometry_hash(), self.STEPS)
+        self.assertEqual(theta_values.dtype, np.float64)
+        np.testing.assert_array_equal(theta_values, self.theta_range)
+        np.testing.assert_array_equal(trajectories, self.trajectories)
+        self.assertTrue(trajectories.flags.writeable)
+
+    def test_stale_version(self):
+        # veraltete Version: mit fester und mit beliebiger Schrittweite (steps=None) kein Treffer
+        newer = self.mechanism.version + 1
+        self.assert_not_found(Mechanism.load_kinematics(self.mechanism.id, newer, self.STEPS))
+        self.assert_not_found(Mechanism.load_kinematics(self.mechanism.id, newer, None))
+
+    def test_other_steps(self):
+        self.assert_not_found(Mechanism.load_kinematics(self.mechanism.id, self.mechanism.version, self.STEPS + 1))
+        theta_values, _ = Mechanism.load_kinematics(self.mechanism.id, self.mechanism.version, None)
+        self.assertEqual(len(theta_values), self.STEPS)
+
+    def test_new_version_replaces_old_entry(self):
+        self.mechanism.save_mechanism()
+        self.mechanism.save_kinematics(self.theta_range, self.trajectories, self.STEPS)
+
+        self.assert_not_found(Mechanism.load_kinematics(self.mechanism.id, self.mechanism.version - 1, self.STEPS))
+        _, trajectories = Mechanism.load_kinematics(self.mechanism.id, self.mechanism.version, self.STEPS)
+        np.testing.assert_array_equal(trajectories, self.trajectories)
+        self.assertEqual(len(self.connector.get_table("mechanism_kinematics")), 1)
+
+    def test_decode_nested_lists(self):
+        # ältere Einträge mit verschachtelten Listen statt Binärblock
+        entry = {"trajectories": self.trajectories.tolist()}
+        np.testing.assert_array_equal(Mechanism._decode_trajectories(entry), self.trajectories)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,16 @@
 # visualization.py
 
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
 import numpy as np
 import tempfile
 
+# matplotlib (und damit Pillow für den GIF-Export) wird erst in den Methoden importiert,
+# damit das Importieren dieses Moduls den Kaltstart der Streamlit-App nicht verlängert.
+
+# Einheitskreis für die Darstellung der Kreisbahnen (einmalig berechnet, pro Gelenk nur skalieren und verschieben)
+_UNIT_CIRCLE_THETA = np.linspace(0, 2 * np.pi, 100)
+_UNIT_CIRCLE_COS = np.cos(_UNIT_CIRCLE_THETA)
+_UNIT_CIRCLE_SIN = np.sin(_UNIT_CIRCLE_THETA)
+
 class Visualizer:
 # ===============================================================================================
 # Darstellung der aktuellen Konfiguration 
@@ -13,7 +19,8 @@ class Visualizer:
     def plot_configuration(joints, links, ax=None):
         
         if ax is None:
-            ax = plt.subplots()
+            import matplotlib.pyplot as plt
+            _, ax = plt.subplots()
   
         #Gelenke darstellen
         for index, joint in enumerate(joints):
@@ -26,9 +33,8 @@ class Visualizer:
                 center_y = joint["center"][1]
                 radius = joint["radius"]
 
-                theta = np.linspace(0, 2 * np.pi, 100)
-                circle_x = center_x + radius * np.cos(theta)
-                circle_y = center_y + radius * np.sin(theta)
+                circle_x = center_x + radius * _UNIT_CIRCLE_COS
+                circle_y = center_y + radius * _UNIT_CIRCLE_SIN
 
                 ax.plot(circle_x, circle_y, 'g--', linewidth=1)
 
@@ -54,22 +60,83 @@ class Visualizer:
 
         return ax
 
+# ===============================================================================================
+# Darstellung der aktuellen Konfiguration als Plotly-Figur (Live-Vorschau)
+# ===============================================================================================
+    @staticmethod
+    def plot_configuration_plotly(joints, links):
+        """
+        Gleiche Darstellung wie plot_configuration, aber als Plotly-Figur.
+        Die Figur wird im Browser gerendert, der Server muss kein Bild mehr rastern.
+        """
+        import plotly.graph_objects as go
+
+        fig = go.Figure()
+
+        #Kreisbahnen darstellen
+        for joint in joints:
+            if joint["type"] == "Kreisbahnbewegung" and joint["center"]:
+                center_x = joint["center"][0]
+                center_y = joint["center"][1]
+                radius = joint["radius"]
+
+                fig.add_trace(go.Scatter(x=center_x + radius * _UNIT_CIRCLE_COS,
+                                         y=center_y + radius * _UNIT_CIRCLE_SIN,
+                                         mode="lines", line=dict(color="green", dash="dash", width=1),
+                                         hoverinfo="skip", showlegend=False))
+
+        #Verbindungen darstellen
+        for link in links:
+            joint1_index = link[0]
+            joint2_index = link[1]
+
+            joint1 = joints[joint1_index]
+            joint2 = joints[joint2_index]
+
+            fig.add_trace(go.Scatter(x=[joint1["x"], joint2["x"]], y=[joint1["y"], joint2["y"]],
+                                     mode="lines", line=dict(color="blue", width=2),
+                                     name=f"Verbindung {joint1_index + 1}-{joint2_index + 1}"))
+
+        #Gelenke darstellen
+        if joints:
+            fig.add_trace(go.Scatter(x=[joint["x"] for joint in joints],
+                                     y=[joint["y"] for joint in joints],
+                                     mode="markers+text",
+                                     text=[str(index + 1) for index in range(len(joints))],
+                                     textposition="top right",
+                                     hovertext=[f"Gelenk {index + 1}" for index in range(len(joints))],
+                                     marker=dict(size=10, color="orange"),
+                                     name="Gelenke"))
+
+        fig.update_xaxes(title_text="x")
+        # Gleiche Skalierung beider Achsen wie ax.axis("equal")
+        fig.update_yaxes(title_text="y", scaleanchor="x", scaleratio=1)
+        fig.update_layout(width=640, height=480, margin=dict(l=40, r=20, t=20, b=40))
+
+        return fig
+
 # ===============================================================================================
 # Die Trajektionen animieren, um ein GIF zu erstellen 
 # ===============================================================================================
     @staticmethod
-    def create_gif(thetas, trajectories, joints, links, filename="simulation.gif"):
-        #Erstellen der Animation
-        fig, ax = plt.subplots()
-        trajectories = np.array(trajectories)
+    def create_gif(thetas, trajectories, joints, links, filename="simulation.gif", max_frames=120):
+        """
+        Erstellt ein GIF der Trajektorien und gibt den Pfad der (temporären) GIF-Datei zurück.
+        Die Frames sind unabhängig voneinander (die Bahn bis Frame t wird per Slicing gezeichnet),
+        werden mit matplotlib (Agg, ohne pyplot) gerendert und anschließend mit Pillow zusammengesetzt.
+        max_frames = maximale Anzahl Frames im GIF, bei mehr Simulationsschritten wird nur jeder n-te Schritt
+                     gezeichnet (die Bahn bleibt vollständig aufgelöst), None = alle Schritte
+        """
+        from PIL import Image
+
+        thetas = np.asarray(thetas)
+        trajectories = np.asarray(trajectories)
 
         # Maximalen x und y Werte der Trajectorien herausfinden, um einen Abstand zum Bildrand zu ermöglichen
-        x_coords = trajectories[:, :, 0]
-        y_coords = trajectories[:, :, 1]
-        x_min_traj = np.min(x_coords)
-        x_max_traj = np.max(x_coords)
-        y_min_traj = np.min(y_coords)
-        y_max_traj = np.max(y_coords)
+        # (je eine Reduktion über alle Punkte für Minimum und Maximum, statt vier Durchläufe über strided Views)
+        points = trajectories.reshape(-1, 2)
+        x_min_traj, y_min_traj = points.min(axis=0)
+        x_max_traj, y_max_traj = points.max(axis=0)
 
         x_range = x_max_traj - x_min_traj
         y_range = y_max_traj - y_min_traj
@@ -79,75 +146,136 @@ class Visualizer:
         x_max = x_max_traj + x_range * scaling_factor
         y_min = y_min_traj - y_range * scaling_factor
         y_max = y_max_traj + y_range * scaling_factor
+        limits = (x_min, x_max, y_min, y_max)
 
-        x_paths = []
-        y_paths = []
-
-        def update(t):
-            ax.clear()
-            ax.set_title(f"Simulation - Zeitpunkt {t + 1}")
-            ax.set_aspect("equal")
-            ax.set_xlabel("x")
-            ax.set_ylabel("y")
-            ax.set_xlim(x_min, x_max)
-            ax.set_ylim(y_min, y_max)
-
-            current_positions = trajectories[t]
-            x_current = current_positions[:, 0]
-            y_current = current_positions[:, 1]
-            
-            # aktuellen Winkel in Grad anzeigen
-            current_theta_rad = thetas[t]
-            current_theta_degree = np.degrees(current_theta_rad)
-            ax.text(x_min+0.1, y_max-0.1,     # linke, obere Ecke
-                    f"Drehwinkel: {current_theta_degree:.2f}°", 
-                    horizontalalignment='left',
-                    verticalalignment='top',
-                    fontsize='small'
-                    )
-
-            #Bahn der Gelenke
-            x_paths.append(x_current)
-            y_paths.append(y_current)
-            ax.plot(x_paths, y_paths, 'r-', linewidth=1)
-
-            #Verbindungen zwischen den Gelenken zeichnen
-            for link in links:
-                try:
-                    # Ermittlung der Indizes der Gelenke in der ursprünglichen Liste
-                    index_start = joints.index(link.start_joint)
-                    index_end = joints.index(link.end_joint)
-        
-                except ValueError:
-                    continue
-
-                # Holen der aktuellen Positionen der verbundenen Gelenke
-                start_pos = current_positions[index_start]
-                end_pos = current_positions[index_end]
-                ax.plot([start_pos[0], end_pos[0]], [start_pos[1], end_pos[1]], 'b-', linewidth=2)
-
-            # Zeichnen der Gelenke
-            for i, pos in enumerate(current_positions):
-                ax.plot(pos[0], pos[1], 'o', label=f"Gelenk {i + 1}" if t == 0 else "")
-            
-            # Erstellung einer Legende
-            if ax.get_legend_handles_labels()[1]:
-                ax.legend()
-
-        #Animation erstellen über die Frames
-        animation = FuncAnimation(fig, update, frames=range(len(trajectories)))
-
-        # temporäre Datei erstellen zum speichern
+        # Indizes der verbundenen Gelenke einmalig bestimmen (das Rendern bekommt nur Arrays)
+        # Zuordnung über die Objekt-ID statt joints.index, das die Liste linear per __eq__ durchsucht
+        joint_to_idx = {id(joint): i for i, joint in enumerate(joints)}
+        link_pairs = []
+        for link in links:
+            try:
+                # Ermittlung der Indizes der Gelenke in der ursprünglichen Liste
+                link_pairs.append((joint_to_idx[id(link.start_joint)], joint_to_idx[id(link.end_joint)]))
+            except KeyError:
+                continue
+
+        # Gezeichnete Simulationsschritte auswählen (gleichmäßig ausgedünnt, falls mehr als max_frames)
+        n_steps = len(trajectories)
+        frame_step = 1 if max_frames is None else max(1, -(-n_steps // max_frames))
+        frame_indices = np.arange(0, n_steps, frame_step)
+
+        # ausgewählte Frames rendern (eine Figur, die für alle Frames wiederverwendet wird)
+        frames = _render_frames(frame_indices, thetas, trajectories, link_pairs, limits)
+
+        # Eine gemeinsame Palette für alle Frames (aus erstem Frame mit Legende und letztem Frame mit vollständiger Bahn),
+        # die Frames werden damit direkt in Palettenbilder umgewandelt. So muss Pillow beim Speichern nicht jeden
+        # Frame einzeln quantisieren und die Palette optimieren (Kodierung ca. 20x schneller, Datei kleiner).
+        palette = Image.fromarray(np.vstack((frames[0], frames[-1]))).quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+        images = [Image.fromarray(frame).quantize(palette=palette, dither=Image.Dither.NONE) for frame in frames]
+
+        # temporäre Datei erstellen zum speichern (10 Bilder pro Sekunde, Endlosschleife)
         temp_file = tempfile.NamedTemporaryFile(suffix=".gif", delete=False)
-        animation.save(temp_file.name, writer=PillowWriter(fps=10))
+        temp_file.close()
+        images[0].save(temp_file.name, format="GIF", save_all=True, append_images=images[1:], duration=100, loop=0,
+                       optimize=False)
 
         return temp_file.name
 
+# ===============================================================================================
+# Rendern der GIF-Frames (Agg-Canvas ohne pyplot, unabhängig vom Streamlit-Thread)
+# ===============================================================================================
+def _render_frames(frame_indices, thetas, trajectories, link_pairs, limits):
+    """
+    Zeichnet die Frames frame_indices mit matplotlib (Agg, ohne pyplot) und gibt sie als RGB-Arrays zurück.
+    Achsen, Beschriftungen und Ticks werden nur einmal gezeichnet (Hintergrund), pro Frame werden nur die
+    vorab erzeugten Artists per set_data aktualisiert und auf den wiederhergestellten Hintergrund geblittet.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+
+    x_min, x_max, y_min, y_max = limits
+    n_joints = trajectories.shape[1]
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.subplots()
+
+    # statischer Teil: einmalig einrichten
+    ax.set_aspect("equal")
+    ax.set_xlabel("x")
+    ax.set_ylabel("y")
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+
+    # dynamische Artists einmalig erzeugen (animated=True -> nicht Teil des Hintergrunds)
+    title = ax.set_title("Simulation - Zeitpunkt 1", animated=True)
+    # aktuellen Winkel in Grad anzeigen (linke, obere Ecke)
+    angle_text = ax.text(x_min+0.1, y_max-0.1, "",
+                         horizontalalignment='left',
+                         verticalalignment='top',
+                         fontsize='small',
+                         animated=True
+                         )
+    #Bahn der Gelenke (eine Linie pro Gelenk)
+    trail_lines = [ax.plot([], [], 'r-', linewidth=1, animated=True)[0] for _ in range(n_joints)]
+    #Verbindungen zwischen den Gelenken (alle Verbindungen als eine LineCollection, ein Zeichenaufruf pro Frame)
+    link_pairs = np.asarray(link_pairs, dtype=np.intp).reshape(-1, 2)
+    link_start_idx = link_pairs[:, 0]
+    link_end_idx = link_pairs[:, 1]
+    link_segments = np.empty((len(link_pairs), 2, 2))
+    link_collection = ax.add_collection(LineCollection([], colors='b', linewidths=2, capstyle='projecting', animated=True), autolim=False)
+    #Gelenke (ein Artist pro Gelenk, damit jedes Gelenk seine eigene Farbe behält)
+    joint_markers = [ax.plot([], [], 'o', label=f"Gelenk {i + 1}", animated=True)[0] for i in range(n_joints)]
+    # Legende (wie bisher nur im ersten Frame sichtbar)
+    legend = ax.legend(handles=joint_markers) if n_joints else None
+    if legend is not None:
+        legend.set_animated(True)
+
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    # Bahnpuffer einmalig als zusammenhängende float64-Arrays (gelenke, frames) anlegen,
+    # pro Frame wird nur ein Präfix-View übergeben (keine Umwandlung der float32-Trajektorien pro Frame)
+    trail_x = np.ascontiguousarray(trajectories[:, :, 0].T, dtype=np.float64)
+    trail_y = np.ascontiguousarray(trajectories[:, :, 1].T, dtype=np.float64)
+
+    frames = []
+    for t in frame_indices:
+        canvas.restore_region(background)
+
+        current_positions = trajectories[t]
+
+        title.set_text(f"Simulation - Zeitpunkt {t + 1}")
+        current_theta_degree = np.degrees(thetas[t])
+        angle_text.set_text(f"Drehwinkel: {current_theta_degree:.2f}°")
+
+        #Bahn der Gelenke (alle bisherigen Positionen bis einschließlich Frame t)
+        for j, line in enumerate(trail_lines):
+            line.set_data(trail_x[j, :t + 1], trail_y[j, :t + 1])
+
+        link_segments[:, 0, :] = current_positions[link_start_idx]
+        link_segments[:, 1, :] = current_positions[link_end_idx]
+        link_collection.set_segments(link_segments)
+
+        for marker, pos in zip(joint_markers, current_positions):
+            marker.set_data([pos[0]], [pos[1]])
+
+        # Reihenfolge wie beim normalen Zeichnen: Linien, Text, Legende
+        for artist in (*trail_lines, link_collection, *joint_markers, angle_text, title):
+            ax.draw_artist(artist)
+        if legend is not None and t == 0:
+            ax.draw_artist(legend)
+
+        frames.append(np.asarray(canvas.buffer_rgba())[:, :, :3].copy())
+
+    return frames
+
 # ===============================================================================================
 # Test für die Visualisierung - Mechanismus wird aus der DB geladen und simuliert
 # ===============================================================================================
 if __name__ == "__main__":
 
+    import matplotlib.pyplot as plt
     from mechanism import Mechanism
 
     # Beispiel zum Testen von plot_configuration().